@@ -30,9 +30,102 @@ DEBUG = os.getenv("DEBUG", "False") == "True"
 # Gemini key
 GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
 
+# Load the embedding model and Gemini client when a web worker starts instead
+# of on its first request (see jobs/model_registry.py)
+AI_WARMUP_ON_START = os.getenv("AI_WARMUP_ON_START", "False") == "True"
+
+# Embedding inference backend: torch, torch-int8, onnx or onnx-int8 (see jobs/model_registry.py)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+# Pre-quantized ONNX file inside the model repo used by the onnx-int8 backend
+EMBEDDING_ONNX_QUANTIZED_FILE = os.getenv("EMBEDDING_ONNX_QUANTIZED_FILE", "onnx/model_quint8_avx2.onnx")
+
+# AI enrichment of cache misses: max concurrent Gemini calls and per-call timeout (seconds)
+AI_ENRICHMENT_CONCURRENCY = int(os.getenv("AI_ENRICHMENT_CONCURRENCY", 5))
+AI_ENRICHMENT_TIMEOUT = float(os.getenv("AI_ENRICHMENT_TIMEOUT", 30))
+# Jobs scored per batched Gemini prompt (1 disables batching) and its timeout
+AI_ENRICHMENT_BATCH_SIZE = int(os.getenv("AI_ENRICHMENT_BATCH_SIZE", 5))
+AI_ENRICHMENT_BATCH_TIMEOUT = float(os.getenv("AI_ENRICHMENT_BATCH_TIMEOUT", 60))
+# Chat reply timeout (seconds) and threads used for embeddings in the async (ASGI) endpoints
+AI_CHAT_TIMEOUT = float(os.getenv("AI_CHAT_TIMEOUT", 60))
+EMBEDDING_EXECUTOR_WORKERS = int(os.getenv("EMBEDDING_EXECUTOR_WORKERS", 2))
+# Semantic chat cache (jobs/chat_cache.py): a reply is reused for a question whose
+# embedding, combined with the asker's role and skills, is at least this cosine-similar
+# to a past one. Entries expire after CHAT_CACHE_TTL seconds; beyond CHAT_CACHE_MAX_ENTRIES
+# the least recently used are evicted.
+CHAT_CACHE_ENABLED = os.getenv("CHAT_CACHE_ENABLED", "True") == "True"
+CHAT_CACHE_SIMILARITY_THRESHOLD = float(os.getenv("CHAT_CACHE_SIMILARITY_THRESHOLD", 0.92))
+CHAT_CACHE_TTL = int(os.getenv("CHAT_CACHE_TTL", 60 * 60 * 24 * 7))
+CHAT_CACHE_MAX_ENTRIES = int(os.getenv("CHAT_CACHE_MAX_ENTRIES", 10000))
+# Gemini gateway (jobs/llm_gateway.py). Rate limit is a token bucket per process ("local")
+# or shared by every worker ("redis"). Transient errors are retried with jittered backoff
+# up to LLM_MAX_RETRIES times, while retries stay under LLM_RETRY_BUDGET_RATIO of calls.
+# After LLM_CIRCUIT_FAILURE_THRESHOLD consecutive failures calls fail fast for
+# LLM_CIRCUIT_RESET_TIMEOUT seconds.
+LLM_RATE_LIMIT_BACKEND = os.getenv("LLM_RATE_LIMIT_BACKEND", "local")
+LLM_RATE_LIMIT_PER_MINUTE = float(os.getenv("LLM_RATE_LIMIT_PER_MINUTE", 60))
+LLM_RATE_LIMIT_BURST = int(os.getenv("LLM_RATE_LIMIT_BURST", 10))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 3))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", 0.5))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", 8))
+LLM_RETRY_BUDGET_RATIO = float(os.getenv("LLM_RETRY_BUDGET_RATIO", 0.2))
+LLM_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", 5))
+LLM_CIRCUIT_RESET_TIMEOUT = float(os.getenv("LLM_CIRCUIT_RESET_TIMEOUT", 30))
+# Local skill-overlap scoring (jobs/skill_scoring.py): when enabled Gemini only writes
+# explanations, and only for jobs scoring at least AI_EXPLANATION_MIN_SCORE.
+# SKILL_MATCH_WEIGHT is the share of the score taken by skill overlap vs vector similarity.
+SKILL_PRESCORING_ENABLED = os.getenv("SKILL_PRESCORING_ENABLED", "True") == "True"
+SKILL_MATCH_WEIGHT = float(os.getenv("SKILL_MATCH_WEIGHT", 0.6))
+AI_EXPLANATION_MIN_SCORE = int(os.getenv("AI_EXPLANATION_MIN_SCORE", 50))
+# Cached enrichments are shared by users with the same role, skills and experience.
+# Lifetime in seconds (0 = no expiry), and the most entries kept before the least
+# recently used are evicted.
+ENRICHMENT_CACHE_TTL = int(os.getenv("ENRICHMENT_CACHE_TTL", 7 * 24 * 3600))
+ENRICHMENT_CACHE_MAX_ENTRIES = int(os.getenv("ENRICHMENT_CACHE_MAX_ENTRIES", 200000))
+# Lifetime of cached profile embeddings in seconds (0 = until the profile changes)
+PROFILE_VECTOR_CACHE_TTL = int(os.getenv("PROFILE_VECTOR_CACHE_TTL", 30 * 24 * 3600))
+
+# Paginated feed: ranked candidates fetched by one KNN per profile and how long that list is cached
+FEED_CANDIDATE_POOL = int(os.getenv("FEED_CANDIDATE_POOL", 100))
+FEED_CANDIDATES_TTL = int(os.getenv("FEED_CANDIDATES_TTL", 600))
+FEED_MAX_PAGE_SIZE = int(os.getenv("FEED_MAX_PAGE_SIZE", 50))
+# Lifetime of an unfiltered ranked feed (seconds, 0 = no expiry); it is recomputed
+# earlier when the profile changes or the job corpus drifts (see `manage.py precompute_feeds`)
+FEED_PRECOMPUTED_TTL = int(os.getenv("FEED_PRECOMPUTED_TTL", 7 * 24 * 3600))
+# A precomputed feed is still served until this many job vectors have been added,
+# re-embedded or removed since it was ranked (metadata-only updates don't count).
+# It stays valid for about N / R hours when ingestion changes R vectors per hour, so
+# with precompute_feeds every T hours the precomputed hit rate is about min(1, N / (R * T)):
+# e.g. 500 with 50 new jobs/hour and a nightly run serves ~40%; running every 10 hours, ~100%.
+FEED_PRECOMPUTED_MAX_STALE_JOBS = int(os.getenv("FEED_PRECOMPUTED_MAX_STALE_JOBS", 500))
+
+# Stale-while-revalidate feed: serve KNN results at once and enrich misses in
+# `manage.py run_enrichment_worker`
+MATCH_FEED_DEFER_ENRICHMENT = os.getenv("MATCH_FEED_DEFER_ENRICHMENT", "False") == "True"
+ENRICHMENT_PENDING_TTL = int(os.getenv("ENRICHMENT_PENDING_TTL", 300))
+ENRICHMENT_STREAM_MAXLEN = int(os.getenv("ENRICHMENT_STREAM_MAXLEN", 100000))
+
 #Redis configuration
 REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
 REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+
+# Job ingestion HTTP client (see jobs/sources/)
+INGESTION_HTTP_POOL_SIZE = int(os.getenv("INGESTION_HTTP_POOL_SIZE", 10))
+INGESTION_HTTP_CONNECT_TIMEOUT = float(os.getenv("INGESTION_HTTP_CONNECT_TIMEOUT", 5))
+INGESTION_HTTP_READ_TIMEOUT = float(os.getenv("INGESTION_HTTP_READ_TIMEOUT", 60))
+
+# Vector index (see jobs/vector_index.py and `manage.py build_job_index`)
+VECTOR_INDEX_ALGORITHM = os.getenv("VECTOR_INDEX_ALGORITHM", "HNSW")
+VECTOR_INDEX_DISTANCE_METRIC = os.getenv("VECTOR_INDEX_DISTANCE_METRIC", "COSINE")
+VECTOR_INDEX_HNSW_M = int(os.getenv("VECTOR_INDEX_HNSW_M", 16))
+VECTOR_INDEX_HNSW_EF_CONSTRUCTION = int(os.getenv("VECTOR_INDEX_HNSW_EF_CONSTRUCTION", 200))
+VECTOR_INDEX_HNSW_EF_RUNTIME = int(os.getenv("VECTOR_INDEX_HNSW_EF_RUNTIME", 10))
+
+# Stored job vector format: FLOAT32 or FLOAT16 (needs Redis Stack 7.4+), optionally
+# PCA-reduced to VECTOR_PCA_DIM dimensions (0 = off; fit with `manage.py fit_vector_pca`).
+# Changing either needs `build_job_index` and `cache_job_vectors` runs.
+VECTOR_STORAGE_TYPE = os.getenv("VECTOR_STORAGE_TYPE", "FLOAT32")
+VECTOR_PCA_DIM = int(os.getenv("VECTOR_PCA_DIM", 0))
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
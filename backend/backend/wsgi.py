@@ -14,3 +14,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+# Optionally load the embedding model and Gemini client before serving traffic
+from django.conf import settings
+
+if settings.AI_WARMUP_ON_START:
+    from jobs.model_registry import warm_up
+
+    warm_up()
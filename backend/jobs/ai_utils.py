@@ -1,20 +1,24 @@
-import os
-import google.generativeai as genai
-from dotenv import load_dotenv
 import logging
 import re
-from sentence_transformers import SentenceTransformer, util
 from redis.commands.search.query import Query
-from .redis_client import redis_client
+from .redis_client import redis_client, redis_binary_client
+from .enrichment_queue import enqueue_enrichments
+from .vector_index import JOB_INDEX_ALIAS, build_filter_query
+from .vector_codec import vector_to_bytes
+from .job_vectors import JOB_CORPUS_VERSION_KEY, corpus_version, job_doc_key, job_key
 import numpy as np
 import json
 import time
+import base64
 import hashlib
-from jobs.models import Job 
-load_dotenv()
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-
-model = genai.GenerativeModel("gemini-2.0-flash")
+import math
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from django.conf import settings
+from jobs.models import Job, JobMatch
+from .model_registry import embedding_model_id, get_embedding_model
+from .llm_gateway import generate_content
+from .skill_scoring import needs_ai_explanation, normalize_skill, score_job_locally
+from .chat_cache import lookup_chat_reply, store_chat_reply
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -28,8 +32,6 @@ missing_skills: [skill1, skill2, ...]
 explanation: [detailed explanation]
 
 User Profile:
-Name: {user.name}
-Email: {user.email}
 Role: {user.role}
 Skills: {user.skills}
 Experience: {user.experience}
@@ -42,7 +44,7 @@ Required Skills: {job['tags']}
 """
 
     try:
-        response = model.generate_content(prompt)
+        response = generate_content(prompt, settings.AI_ENRICHMENT_TIMEOUT)
         
         # Validate response
         if not response or not response.text:
@@ -59,55 +61,308 @@ Required Skills: {job['tags']}
     except Exception as e:
         logger.error(f"AI enrichment failed: {str(e)}", exc_info=True)
         # Return original job with default values
-        return {**job, 
-                "match_score": 0,
-                "matched_skills": [],
-                "missing_skills": [],
-                "explanation": f"AI enrichment failed: {str(e)}"}
+        return failed_enrichment(job, str(e))
 
-def parse_ai_response(text):
-    try:
-        # Define regex patterns with more flexible matching
-        patterns = {
-            'match_score': r'match_score\s*:\s*(\d+)',
-            'matched_skills': r'matched_skills\s*:\s*\[(.*?)\]',
-            'missing_skills': r'missing_skills\s*:\s*\[(.*?)\]',
-            'explanation': r'explanation\s*:\s*([^\n]*(?:\n(?!\w+:).*)*)'
-        }
-        
-        # Extract data with validation
-        match_score = re.search(patterns['match_score'], text)
-        if not match_score:
-            raise ValueError("Could not find match_score")
-        
-        matched_skills = re.search(patterns['matched_skills'], text)
-        missing_skills = re.search(patterns['missing_skills'], text)
-        explanation = re.search(patterns['explanation'], text, re.MULTILINE)
-        
-        # Process and validate the extracted data
-        result = {
-            "match_score": min(100, max(0, int(match_score.group(1)))),
-            "matched_skills": [s.strip() for s in (matched_skills.group(1).split(',') if matched_skills else [])],
-            "missing_skills": [s.strip() for s in (missing_skills.group(1).split(',') if missing_skills else [])],
-            "explanation": explanation.group(1).strip() if explanation else "No explanation provided"
-        }
-        
-        return result
+# Set on match data whose AI step failed. Such results are still returned,
+# but never cached or saved, so the next request asks Gemini again.
+ENRICHMENT_FAILED_FIELD = "enrichment_failed"
 
-    except (AttributeError, ValueError) as e:
-        logger.error(f"Error parsing AI response: {str(e)}", exc_info=True)
-        # Return default values instead of empty dict
-        return {
+def failed_enrichment(job, reason):
+    return {**job,
             "match_score": 0,
             "matched_skills": [],
             "missing_skills": [],
-            "explanation": "Failed to parse AI response"
+            "explanation": f"AI enrichment failed: {reason}",
+            ENRICHMENT_FAILED_FIELD: True}
+
+def enrich_jobs_with_ai_batch(user, jobs):
+    # Scores many jobs for one user in a single structured request, so the
+    # profile is sent once. Returns {job_id: parsed_fields} for every job the
+    # model answered for; anything missing is left to the per-job fallback.
+    jobs_payload = [
+        {
+            "id": job["id"],
+            "title": job["title"],
+            "company": job["company"],
+            "description": job["description"],
+            "required_skills": job["tags"],
         }
-    
-def get_ai_chat_response(message, user_profile):
+        for job in jobs
+    ]
+    prompt = f"""
+Analyze how well this user matches each of the jobs below.
+Respond with only a JSON array containing one object per job, in this exact shape:
+[{{"id": "<job id>", "match_score": <number between 0-100>, "matched_skills": ["skill1", ...], "missing_skills": ["skill1", ...], "explanation": "<detailed explanation>"}}]
+
+User Profile:
+Role: {user.role}
+Skills: {user.skills}
+Experience: {user.experience}
+
+Jobs:
+{json.dumps(jobs_payload, ensure_ascii=False)}
+"""
+
+    try:
+        response = generate_content(
+            prompt,
+            settings.AI_ENRICHMENT_BATCH_TIMEOUT,
+            generation_config={"response_mime_type": "application/json"},
+        )
+        if not response or not response.text:
+            raise ValueError("Empty response from AI")
+        return parse_ai_batch_response(response.text, [job["id"] for job in jobs])
+    except Exception as e:
+        logger.error(f"Batch AI enrichment failed: {str(e)}", exc_info=True)
+        return {}
+
+def run_concurrently(func, items, timeout, on_timeout):
+    # Runs func over a bounded thread pool; results come back in the same
+    # order as `items`.
+    if not items:
+        return []
+
+    workers = max(1, min(settings.AI_ENRICHMENT_CONCURRENCY, len(items)))
+    # Every call gets its own timeout; queued calls wait for a free worker first
+    deadline = time.monotonic() + timeout * math.ceil(len(items) / workers)
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ai-enrich")
+    try:
+        futures = [executor.submit(func, item) for item in items]
+        results = []
+        for item, future in zip(items, futures):
+            try:
+                results.append(future.result(timeout=max(0.0, deadline - time.monotonic())))
+            except FutureTimeoutError:
+                results.append(on_timeout(item))
+        return results
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def enrich_jobs_concurrently(user, jobs):
+    # Enriches jobs in batched prompts first, then falls back to one prompt
+    # per job for anything the batch responses did not cover. Results come
+    # back in the same order as `jobs`.
+    if not jobs:
+        return []
+
+    parsed = {}
+    batch_size = settings.AI_ENRICHMENT_BATCH_SIZE
+    if batch_size > 1 and len(jobs) > 1:
+        batches = [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]
+
+        def on_batch_timeout(batch):
+            logger.error(f"Batch AI enrichment timed out for {len(batch)} jobs")
+            return {}
+
+        for result in run_concurrently(
+            lambda batch: enrich_jobs_with_ai_batch(user, batch),
+            batches,
+            settings.AI_ENRICHMENT_BATCH_TIMEOUT,
+            on_batch_timeout,
+        ):
+            parsed.update(result)
+
+    def on_job_timeout(job):
+        logger.error(f"AI enrichment timed out for job {job['id']}")
+        return failed_enrichment(job, "timed out")
+
+    fallback = [job for job in jobs if job["id"] not in parsed]
+    if fallback and parsed:
+        logger.warning(f"Batch AI enrichment missed {len(fallback)} jobs, retrying them one by one")
+    for job, result in zip(fallback, run_concurrently(
+        lambda job: enrich_job_with_ai(user, job),
+        fallback,
+        settings.AI_ENRICHMENT_TIMEOUT,
+        on_job_timeout,
+    )):
+        parsed[job["id"]] = result
+
+    return [{**job, **parsed[job["id"]]} for job in jobs]
+
+def explanation_prompt(user, jobs):
+    # Scores and skills are already computed locally; Gemini only writes the
+    # explanation
+    jobs_payload = [
+        {
+            "id": job["id"],
+            "title": job["title"],
+            "company": job["company"],
+            "description": job["description"],
+            "matched_skills": job["matched_skills"],
+            "missing_skills": job["missing_skills"],
+        }
+        for job in jobs
+    ]
     prompt = f"""
+Explain in 2-4 sentences why each of the jobs below is a good fit for this user and what they should work on.
+The matched and missing skills are already known; do not re-score the jobs.
+Respond with only a JSON array containing one object per job, in this exact shape:
+[{{"id": "<job id>", "explanation": "<explanation>"}}]
+
+User Profile:
+Role: {user.role}
+Skills: {user.skills}
+Experience: {user.experience}
+
+Jobs:
+{json.dumps(jobs_payload, ensure_ascii=False)}
+"""
+    return prompt
+
+def parse_ai_explanations(text, jobs):
+    # {job_id: explanation} for the jobs the model answered for
+    wanted = {str(job["id"]) for job in jobs}
+    explanations = {}
+    for item in load_ai_json_list(text):
+        try:
+            job_id = str(item["id"]).strip()
+            explanation = str(item.get("explanation") or "").strip()
+        except (KeyError, TypeError) as e:
+            logger.warning(f"Skipping malformed AI explanation item: {str(e)}")
+            continue
+        if job_id in wanted and explanation:
+            explanations.setdefault(job_id, explanation)
+    return explanations
+
+def explain_jobs_with_ai_batch(user, jobs):
+    # Returns {job_id: explanation} for the jobs Gemini answered for
+    try:
+        response = generate_content(
+            explanation_prompt(user, jobs),
+            settings.AI_ENRICHMENT_BATCH_TIMEOUT,
+            generation_config={"response_mime_type": "application/json"},
+        )
+        if not response or not response.text:
+            raise ValueError("Empty response from AI")
+    except Exception as e:
+        logger.error(f"AI explanation failed: {str(e)}", exc_info=True)
+        return {}
+    return parse_ai_explanations(response.text, jobs)
+
+def score_jobs(user, jobs, distances):
+    # Match fields for each job, in the same order as `jobs`. Scores and
+    # skills come from the local skill/vector scorer; Gemini is only asked to
+    # explain the promising ones, and the rest never wait on an AI call.
+    # `distances` are the KNN cosine distances (None when unknown).
+    if not settings.SKILL_PRESCORING_ENABLED:
+        return enrich_jobs_concurrently(user, jobs)
+
+    scored, to_explain = prescore_jobs(user, jobs, distances)
+    if not to_explain:
+        return scored
+
+    def on_batch_timeout(batch):
+        logger.error(f"AI explanation timed out for {len(batch)} jobs")
+        return {}
+
+    explanations = {}
+    for result in run_concurrently(
+        lambda batch: explain_jobs_with_ai_batch(user, batch),
+        explanation_batches(to_explain),
+        settings.AI_ENRICHMENT_BATCH_TIMEOUT,
+        on_batch_timeout,
+    ):
+        explanations.update(result)
+
+    apply_explanations(to_explain, explanations)
+    return scored
+
+def prescore_jobs(user, jobs, distances):
+    # Locally scored copies of `jobs`, plus the subset worth an AI explanation
+    scored = [{**job, **score_job_locally(user.skills, job, distance)} for job, distance in zip(jobs, distances)]
+    return scored, [job for job in scored if needs_ai_explanation(job)]
+
+def explanation_batches(jobs):
+    batch_size = max(1, settings.AI_ENRICHMENT_BATCH_SIZE)
+    return [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]
+
+def apply_explanations(jobs, explanations):
+    # Jobs Gemini did not explain keep the locally generated explanation,
+    # and are flagged so they get a real one on a later request
+    for job in jobs:
+        explanation = explanations.get(str(job["id"]))
+        if explanation:
+            job["explanation"] = explanation
+        else:
+            job[ENRICHMENT_FAILED_FIELD] = True
+
+def load_ai_json_list(text):
+    # The JSON array of a batch response; [] if it cannot be read
+    try:
+        cleaned = text.strip()
+        # Tolerate a ```json fenced block even though we asked for bare JSON
+        fenced = re.match(r"^```(?:json)?\s*(.*?)\s*```$", cleaned, re.DOTALL)
+        if fenced:
+            cleaned = fenced.group(1)
+        data = json.loads(cleaned)
+    except (ValueError, TypeError) as e:
+        logger.error(f"Error parsing batch AI response: {str(e)}")
+        return []
+
+    if isinstance(data, dict):
+        data = data.get("results") or data.get("jobs") or []
+    if not isinstance(data, list):
+        logger.error("Batch AI response is not a JSON array")
+        return []
+    return data
+
+def parse_ai_batch_response(text, job_ids):
+    # Maps each item of a batch JSON response back to its job id. Items that
+    # are malformed or refer to unknown ids are dropped.
+    wanted = {str(job_id) for job_id in job_ids}
+    results = {}
+
+    for item in load_ai_json_list(text):
+        try:
+            job_id = str(item["id"]).strip()
+            if job_id not in wanted or job_id in results:
+                continue
+            results[job_id] = {
+                "match_score": min(100, max(0, int(float(item["match_score"])))),
+                "matched_skills": [str(s).strip() for s in item.get("matched_skills") or []],
+                "missing_skills": [str(s).strip() for s in item.get("missing_skills") or []],
+                "explanation": str(item.get("explanation") or "No explanation provided").strip(),
+            }
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Skipping malformed batch AI item: {str(e)}")
+
+    return results
+
+def parse_ai_response(text):
+    # Raises ValueError when there is no usable match_score, so the caller
+    # returns a failed_enrichment that is never cached
+
+    # Define regex patterns with more flexible matching
+    patterns = {
+        'match_score': r'match_score\s*:\s*(\d+)',
+        'matched_skills': r'matched_skills\s*:\s*\[(.*?)\]',
+        'missing_skills': r'missing_skills\s*:\s*\[(.*?)\]',
+        'explanation': r'explanation\s*:\s*([^\n]*(?:\n(?!\w+:).*)*)'
+    }
+
+    # Extract data with validation
+    match_score = re.search(patterns['match_score'], text)
+    if not match_score:
+        raise ValueError("Could not find match_score in AI response")
+
+    matched_skills = re.search(patterns['matched_skills'], text)
+    missing_skills = re.search(patterns['missing_skills'], text)
+    explanation = re.search(patterns['explanation'], text, re.MULTILINE)
+
+    # Process and validate the extracted data
+    return {
+        "match_score": min(100, max(0, int(match_score.group(1)))),
+        "matched_skills": [s.strip() for s in (matched_skills.group(1).split(',') if matched_skills else [])],
+        "missing_skills": [s.strip() for s in (missing_skills.group(1).split(',') if missing_skills else [])],
+        "explanation": explanation.group(1).strip() if explanation else "No explanation provided"
+    }
+
+CHAT_FALLBACK_REPLY = "I'm sorry, I couldn't process that question right now."
+
+def chat_prompt(message, user_profile):
+    return f"""
 You are an AI career assistant. The user has this profile:
-- Name: {user_profile.get('name', 'Anonymous')}
 - Role: {user_profile.get('role', 'Developer')}
 - Skills: {', '.join(user_profile.get('skills', []))}
 - Experience: {user_profile.get('experience', 'Not specified')}
@@ -117,140 +372,524 @@ User asked: "{message}"
 Respond in a helpful, structured way.
 """
 
+def get_ai_chat_response(message, user_profile):
+    cached, vector = lookup_chat_reply(message, user_profile)
+    if cached:
+        return cached
     try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        response = generate_content(chat_prompt(message, user_profile), settings.AI_CHAT_TIMEOUT)
+        reply = response.text.strip()
     except Exception as e:
         logger.error(f"Error generating AI chat response: {str(e)}", exc_info=True)
-        return "I'm sorry, I couldn't process that question right now."
+        return CHAT_FALLBACK_REPLY
+    store_chat_reply(message, user_profile, vector, reply)
+    return reply
+
+def stream_ai_chat_response(message, user_profile):
+    # Yields the reply text as Gemini produces it. Raises TimeoutError once
+    # AI_CHAT_TIMEOUT has passed since the request started. A cached reply
+    # is yielded whole; a fresh one is cached only if it streamed to the end.
+    cached, vector = lookup_chat_reply(message, user_profile)
+    if cached:
+        yield cached
+        return
+
+    deadline = time.monotonic() + settings.AI_CHAT_TIMEOUT
+    response = generate_content(chat_prompt(message, user_profile), settings.AI_CHAT_TIMEOUT, stream=True)
+    parts = []
+    for chunk in response:
+        if time.monotonic() > deadline:
+            raise TimeoutError("Chat reply took too long")
+        text = chunk_text(chunk)
+        if text:
+            parts.append(text)
+            yield text
+    store_chat_reply(message, user_profile, vector, "".join(parts).strip())
+
+def chunk_text(chunk):
+    # Chunks without text parts (e.g. a final safety or finish marker) raise on .text
+    try:
+        return chunk.text
+    except ValueError:
+        return ""
     
-embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-
+# Profile vectors are cached at full precision; vector_to_bytes converts them
+# to the index's storage format at query time
 def float32_to_bytes(vec):
     return np.array(vec, dtype=np.float32).tobytes()
 
 
-def match_user_to_jobs(user, top_k=10):
-    # Create profile text for vector embedding
-    profile_text = f"{user.name} {user.role} {' '.join(user.skills)} {user.experience}"
-    user_vector = embedding_model.encode(profile_text, normalize_embeddings=True)
+# The KNN query only returns the score; full job fields are read from the
+# job:<id> and jobdoc:<id> hashes for the page being served
+KNN_RETURN_FIELDS = ("score",)
+JOB_HASH_FIELDS = ("title", "company", "location", "type", "posted", "salary")
+JOB_DOC_FIELDS = ("description", "tags", "benefits")
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def provisional_match_score(distance):
+    # KNN returns cosine distance; turn it into a 0-100 score usable until
+    # the AI enrichment arrives.
+    similarity = 1.0 - float(distance)
+    return int(round(min(1.0, max(0.0, similarity)) * 100))
+
+
+def filters_fingerprint(filters):
+    return hashlib.md5(json.dumps(filters or {}, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def encode_feed_cursor(profile_hash, filters_hash, offset):
+    payload = json.dumps({"p": profile_hash, "f": filters_hash, "o": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_feed_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return position["p"], position["f"], int(position["o"])
+    except (ValueError, TypeError, KeyError) as e:
+        raise InvalidCursorError("Malformed cursor") from e
+
 
-    # Search top K*2 jobs from Redis vector index
-    q = (
-        Query("*=>[KNN %d @embedding $vec AS score]" % (top_k * 2))
+def precomputed_feed_key(profile_hash):
+    return f"feed:{profile_hash}:precomputed"
+
+
+def feed_candidates_key(profile_hash, filters):
+    return f"feed:{profile_hash}:{filters_fingerprint(filters)}:candidates"
+
+
+def parse_precomputed_feed(stored, version):
+    # None when missing, or when more than FEED_PRECOMPUTED_MAX_STALE_JOBS job
+    # vectors have changed since it was computed. Jobs removed since then are
+    # dropped when the page is assembled; new ones wait for the next precompute.
+    if not stored:
+        return None
+    feed = json.loads(stored)
+    changed = int(version or 0) - feed["corpus_version"]
+    if not 0 <= changed <= settings.FEED_PRECOMPUTED_MAX_STALE_JOBS:
+        return None
+    return feed["ranked"]
+
+
+def get_precomputed_feed(profile_hash):
+    # Unfiltered ranking written by `manage.py precompute_feeds` (or by an
+    # earlier on-demand KNN); None once the job corpus has drifted too far
+    return parse_precomputed_feed(*redis_client.mget(precomputed_feed_key(profile_hash), JOB_CORPUS_VERSION_KEY))
+
+
+def precomputed_feed_value(ranked, version):
+    return json.dumps({"corpus_version": version, "ranked": ranked})
+
+
+def store_precomputed_feeds(feeds, version):
+    # feeds: (profile_hash, ranked) pairs computed against corpus `version`
+    ttl = settings.FEED_PRECOMPUTED_TTL or None
+    pipe = redis_client.pipeline(transaction=False)
+    for profile_hash, ranked in feeds:
+        pipe.set(precomputed_feed_key(profile_hash), precomputed_feed_value(ranked, version), ex=ttl)
+    pipe.execute()
+
+
+# Last feed request per user id (ZSET scored by timestamp). Cache hits don't
+# write JobMatch rows, so this is what precompute_feeds uses to find users.
+FEED_LAST_SEEN_KEY = "feed:last_seen"
+
+
+def record_feed_activity(user_id):
+    try:
+        redis_client.zadd(FEED_LAST_SEEN_KEY, {user_id: time.time()})
+    except Exception as e:
+        logger.warning(f"Failed to record feed activity for {user_id}: {str(e)}")
+
+
+def active_user_ids(since):
+    # Ids of users who requested a feed at or after the `since` timestamp
+    return redis_client.zrangebyscore(FEED_LAST_SEEN_KEY, since, "+inf")
+
+
+def knn_query(filters):
+    # Filters are applied inside the index before KNN
+    pool_size = settings.FEED_CANDIDATE_POOL
+    return (
+        Query("%s=>[KNN %d @embedding $vec AS score]" % (build_filter_query(filters), pool_size))
         .sort_by("score")
-        .paging(0, top_k * 2)
-        .return_fields("id", "title", "description", "skills", "company", "location", "type", "posted", "tags", "salary", "benefits")
+        .paging(0, pool_size)
+        .return_fields(*KNN_RETURN_FIELDS)
         .dialect(2)
     )
 
-    results = redis_client.ft("job_idx").search(q, query_params={"vec": float32_to_bytes(user_vector)})
 
-    enriched_jobs = []
-    seen_keys = set()
+def ranked_from_results(results):
+    # Duplicates are rejected at ingestion, so every hit is a distinct posting
+    return [[doc.id.split(":")[-1], float(doc.score)] for doc in results.docs]
 
-    for doc in results.docs:
-        raw_key = f"{doc.title.strip().lower()}_{doc.company.strip().lower()}_{doc.location.strip().lower()}"
-        job_hash = hashlib.md5(raw_key.encode()).hexdigest()
 
-        if job_hash in seen_keys:
-            continue
-        seen_keys.add(job_hash)
+def get_ranked_candidates(user, profile_hash, filters):
+    # Ranked job list for a profile + filter combination. The unfiltered feed
+    # is kept until the profile changes or the job corpus drifts past
+    # FEED_PRECOMPUTED_MAX_STALE_JOBS changed vectors; filtered lists are
+    # cached for FEED_CANDIDATES_TTL. Later pages are served from this list.
+    if not filters:
+        ranked = get_precomputed_feed(profile_hash)
+        if ranked is not None:
+            return ranked
+        # Read before searching: a corpus change during the search leaves the
+        # stored feed already stale rather than wrongly current
+        version = corpus_version()
+
+    key = feed_candidates_key(profile_hash, filters)
+    if filters:
+        cached = redis_client.get(key)
+        if cached:
+            return json.loads(cached)
+
+    user_vector = get_profile_vector(user)
+    results = redis_client.ft(JOB_INDEX_ALIAS).search(knn_query(filters), query_params={"vec": vector_to_bytes(user_vector)})
+    ranked = ranked_from_results(results)
+
+    if filters:
+        redis_client.set(key, json.dumps(ranked), ex=settings.FEED_CANDIDATES_TTL)
+    else:
+        store_precomputed_feeds([(profile_hash, ranked)], version)
+    return ranked
+
+
+def match_user_to_jobs(user, page_size=10, cursor=None, defer_enrichment=False, filters=None):
+    # Returns one page of the ranked feed: {"results": [...], "next_cursor": ...}.
+    # Only the requested page is enriched.
+    profile_hash = user_profile_hash(user)
+    filters_hash = filters_fingerprint(filters)
+    offset = cursor_offset(cursor, profile_hash, filters_hash)
+
+    ranked = get_ranked_candidates(user, profile_hash, filters)
+    page, next_cursor = paginate_feed(ranked, offset, page_size, profile_hash, filters_hash)
+    cache_keys = page_cache_keys(user, page)
+
+    # One round trip for every candidate instead of one GET per job
+    cached_values = redis_client.mget(cache_keys) if cache_keys else []
+    candidates = build_feed_candidates(user, page, cache_keys, cached_values)
+    touch_enrichments(candidates)
+
+    # Build job objects for the misses from their Redis hashes in one round trip
+    misses = [candidate for candidate in candidates if "data" not in candidate]
+    candidates, misses = attach_index_jobs(candidates, misses, fetch_jobs_from_index([c["job_id"] for c in misses]))
+
+    if defer_enrichment:
+        ready, waiting = prescore_deferred(user, misses)
+        store_enriched_jobs(user, ready)
+        # Answer now with a provisional result; a worker fills the cache later
+        enqueue_enrichments(user, waiting)
+        return {"results": deferred_feed_results(candidates, waiting), "next_cursor": next_cursor}
+
+    # Score all cache misses at once instead of one Gemini round trip after another
+    logger.debug(f"Scoring {len(misses)} uncached jobs")
+    enriched = score_jobs(
+        user,
+        [candidate["job"] for candidate in misses],
+        [candidate["distance"] for candidate in misses],
+    )
+    for candidate, result in zip(misses, enriched):
+        # Merge job + enriched fields
+        candidate["data"] = {**candidate["job"], **result}
+
+    # Only fresh enrichments are persisted; cache hits only refresh their LRU position
+    store_enriched_jobs(user, [(candidate["cache_key"], candidate["data"]) for candidate in misses])
+
+    # Assemble in KNN rank order
+    return {"results": [candidate["data"] for candidate in candidates], "next_cursor": next_cursor}
 
-        job_id = doc.id.split(":")[-1]
 
-        # Create user-job cache key
-        # Generate stable hashes
-        user_hash = hashlib.md5(user.email.encode()).hexdigest()
+def cursor_offset(cursor, profile_hash, filters_hash):
+    if not cursor:
+        return 0
+    cursor_profile, cursor_filters, offset = decode_feed_cursor(cursor)
+    if cursor_profile != profile_hash or cursor_filters != filters_hash:
+        raise InvalidCursorError("Cursor does not match the current profile or filters")
+    return offset
 
-        # Generate a hash of the current user profile (name, role, skills, experience)
-        profile_data = f"{user.name} {user.role} {' '.join(user.skills)} {user.experience}"
-        profile_hash = hashlib.md5(profile_data.encode()).hexdigest()
 
-        # Updated cache key includes the profile hash
-        cache_key = f"user:{user_hash}:profile:{profile_hash}:job:{job_id}:enriched"
+def paginate_feed(ranked, offset, page_size, profile_hash, filters_hash):
+    page = ranked[offset:offset + page_size]
+    next_offset = offset + len(page)
+    next_cursor = encode_feed_cursor(profile_hash, filters_hash, next_offset) if next_offset < len(ranked) else None
+    return page, next_cursor
 
-        # Now check the cache
-        cached = redis_client.get(cache_key)
 
+def page_cache_keys(user, page):
+    # Shared by every user with the same match profile; editing one of its
+    # fields moves the user to other keys
+    fingerprint = match_profile_fingerprint(user)
+    return [enrichment_cache_key(fingerprint, job_id) for job_id, _ in page]
+
+
+def build_feed_candidates(user, page, cache_keys, cached_values):
+    # Cache hits carry their stored "data"; misses carry the job id and distance
+    candidates = []
+    for (job_id, distance), cache_key, cached in zip(page, cache_keys, cached_values):
         if cached:
             try:
-                job_data = json.loads(cached)
-                enriched_jobs.append(job_data)
-                # Also save to Job model if it doesn't exist
-                Job.objects.update_or_create(
-                    id=job_data["id"],
-                    defaults={
-                        "title": job_data["title"],
-                        "description": job_data["description"],
-                        "skills": job_data.get("skills", []),
-                        "matched_skills": job_data.get("matched_skills", []),
-                        "missing_skills": job_data.get("missing_skills", []),
-                        "match_score": job_data.get("match_score", 0.0),
-                        "explanation": job_data.get("explanation", ""),
-                        "company": job_data["company"],
-                        "location": job_data["location"],
-                        "type": job_data["type"],
-                        "tags": job_data.get("tags", []),
-                        "salary": job_data.get("salary", ""),
-                        "benefits": job_data.get("benefits", []),
-                    }
-                )
-
-                if len(enriched_jobs) >= top_k:
-                    break
+                candidates.append({"cache_key": cache_key, "data": json.loads(cached)})
                 continue
             except Exception as e:
                 logger.warning(f"Failed to load cached job {job_id} for user {user.email}: {str(e)}")
 
-        # Build job object
-        job = {
-            "id": job_id,
-            "title": doc.title,
-            "company": doc.company,
-            "location": doc.location,
-            "type": doc.type,
-            "posted": str(doc.posted),
-            "description": doc.description,
-            "tags": json.loads(doc.tags),
-            "salary": doc.salary,
-            "benefits": json.loads(doc.benefits),
+        candidates.append({"cache_key": cache_key, "job_id": job_id, "distance": distance})
+    return candidates
+
+
+def attach_index_jobs(candidates, misses, jobs):
+    # Jobs removed from the index since the list was ranked are dropped
+    for candidate, job in zip(misses, jobs):
+        candidate["job"] = job
+    candidates = [candidate for candidate in candidates if "data" in candidate or candidate["job"]]
+    misses = [candidate for candidate in misses if candidate["job"]]
+    return candidates, misses
+
+
+def prescore_deferred(user, misses):
+    # Splits the misses of a deferred page into (cache_key, data) items that
+    # are final now and candidates that still need the worker
+    if not settings.SKILL_PRESCORING_ENABLED:
+        return [], misses
+
+    # Local scores are final right away; only jobs that get an AI
+    # explanation go through the worker
+    for candidate in misses:
+        candidate["data"] = {
+            **candidate["job"],
+            **score_job_locally(user.skills, candidate["job"], candidate["distance"]),
         }
-        print(f"🔍 Enriching job {job['title']} for user {user.email} with AI...")
-        # Enrich with AI
-        enriched = enrich_job_with_ai(user, job)
+    ready = [(c["cache_key"], c["data"]) for c in misses if not needs_ai_explanation(c["data"])]
+    return ready, [candidate for candidate in misses if needs_ai_explanation(candidate["data"])]
+
+
+def deferred_feed_results(candidates, waiting):
+    waiting_keys = {candidate["cache_key"] for candidate in waiting}
+    results = []
+    for candidate in candidates:
+        if candidate["cache_key"] not in waiting_keys:
+            results.append(candidate["data"])
+        elif "data" in candidate:
+            # Scored locally; only the explanation is still on its way
+            results.append({**candidate["data"], "pending": True})
+        else:
+            results.append({
+                **candidate["job"],
+                "pending": True,
+                "match_score": provisional_match_score(candidate["distance"]),
+                "matched_skills": [],
+                "missing_skills": [],
+                "explanation": "",
+            })
+    return results
+
+
+# Enrichments depend only on the match-relevant profile fields, so they are
+# keyed by a canonical fingerprint of those and reused across users. Memory
+# is bounded by ENRICHMENT_CACHE_TTL and by an LRU index (last use per key)
+# that evicts beyond ENRICHMENT_CACHE_MAX_ENTRIES.
+ENRICHMENT_LRU_KEY = "enrichment:lru"
+
+# Experience ranges offered by the profile form, with the exclusive upper
+# bound in years; free-form values are mapped onto them
+EXPERIENCE_BUCKETS = (("0-1", 2), ("2-4", 5), ("5-7", 8), ("8-10", 11), ("10+", None))
+
+
+def experience_bucket(experience):
+    value = str(experience or "").strip().lower()
+    if value in {label for label, _ in EXPERIENCE_BUCKETS}:
+        return value
+    years = re.search(r"\d+", value)
+    if not years:
+        return value
+    for label, upper in EXPERIENCE_BUCKETS:
+        if upper is None or int(years.group()) < upper:
+            return label
+
+
+def match_profile_fingerprint(user):
+    # Order- and case-insensitive; name, email and resume are not part of it
+    canonical = {
+        "role": " ".join(str(user.role or "").lower().split()),
+        "skills": sorted({normalize_skill(skill) for skill in user.skills or []} - {""}),
+        "experience": experience_bucket(user.experience),
+    }
+    return hashlib.md5(json.dumps(canonical, sort_keys=True).encode()).hexdigest()
+
+
+def enrichment_cache_key(fingerprint, job_id):
+    return f"enrichment:cache:{fingerprint}:job:{job_id}"
+
+
+def queue_enrichment_writes(pipe, items):
+    # Adds the cache writes for `items` to `pipe`; its last reply is the
+    # number of entries in the LRU index
+    now = time.time()
+    ttl = settings.ENRICHMENT_CACHE_TTL or None
+    for cache_key, full_data in items:
+        pipe.set(cache_key, json.dumps(full_data), ex=ttl)
+    pipe.zadd(ENRICHMENT_LRU_KEY, {cache_key: now for cache_key, _ in items})
+    if ttl:
+        # Entries unused for a whole TTL have expired on their own
+        pipe.zremrangebyscore(ENRICHMENT_LRU_KEY, "-inf", now - ttl)
+    pipe.zcard(ENRICHMENT_LRU_KEY)
+
+
+def touch_enrichments(candidates):
+    hits = [candidate["cache_key"] for candidate in candidates if "data" in candidate]
+    if not hits:
+        return
+    try:
+        redis_client.zadd(ENRICHMENT_LRU_KEY, {cache_key: time.time() for cache_key in hits}, xx=True)
+    except Exception as e:
+        logger.warning(f"Failed to refresh {len(hits)} cached enrichments: {str(e)}")
 
-        # Merge job + enriched fields
-        full_data = {**job, **enriched}
-        # Save to Job model as well
-        Job.objects.update_or_create(
-            id=full_data["id"],
-            defaults={
-                "title": full_data["title"],
-                "description": full_data["description"],
-                "skills": full_data.get("skills", []),
-                "matched_skills": full_data.get("matched_skills", []),
-                "missing_skills": full_data.get("missing_skills", []),
-                "match_score": full_data.get("match_score", 0.0),
-                "explanation": full_data.get("explanation", ""),
-                "company": full_data["company"],
-                "location": full_data["location"],
-                "type": full_data["type"],
-                "tags": full_data.get("tags", []),
-                "salary": full_data.get("salary", ""),
-                "benefits": full_data.get("benefits", []),
-            }
-        )
 
-        enriched_jobs.append(full_data)
+def evict_enrichments(size):
+    # Drops the least recently used entries beyond ENRICHMENT_CACHE_MAX_ENTRIES
+    overflow = size - settings.ENRICHMENT_CACHE_MAX_ENTRIES
+    if overflow <= 0:
+        return
+    evicted = [cache_key for cache_key, _ in redis_client.zpopmin(ENRICHMENT_LRU_KEY, overflow)]
+    if evicted:
+        redis_client.delete(*evicted)
+
+
+def user_profile_text(user):
+    # Profile text used for the vector embedding (role, skills, experience)
+    return f"{user.role} {' '.join(user.skills)} {user.experience}"
 
-        try:
-            # Save full data to Redis for next time
-            redis_client.set(cache_key, json.dumps(full_data))
-        except Exception as e:
-            logger.error(f"Failed to cache job {job_id} for user {user.email}: {str(e)}", exc_info=True)
 
-        if len(enriched_jobs) >= top_k:
-            break
+def user_profile_hash(user):
+    # Hash of the current user profile
+    return hashlib.md5(user_profile_text(user).encode()).hexdigest()
 
-    return enriched_jobs
+
+def profile_vector_key(profile_hash):
+    return f"profile:{profile_hash}:vector:{embedding_model_id()}"
+
+
+def get_profile_vector(user):
+    # The embedding only changes when the profile does, so encode once per
+    # profile edit instead of once per feed load
+    key = profile_vector_key(user_profile_hash(user))
+    try:
+        cached = redis_binary_client.get(key)
+        if cached:
+            return np.frombuffer(cached, dtype=np.float32)
+    except Exception as e:
+        logger.warning(f"Failed to read cached profile vector for user {user.email}: {str(e)}")
+
+    vector = encode_profile(user)
+    try:
+        redis_binary_client.set(key, float32_to_bytes(vector), ex=settings.PROFILE_VECTOR_CACHE_TTL or None)
+    except Exception as e:
+        logger.warning(f"Failed to cache profile vector for user {user.email}: {str(e)}")
+    return vector
+
+
+def encode_profile(user):
+    # CPU-bound; async callers run it on an executor
+    return get_embedding_model().encode(user_profile_text(user), normalize_embeddings=True)
+
+
+def invalidate_profile_vector(profile_hash):
+    try:
+        redis_binary_client.delete(profile_vector_key(profile_hash))
+    except Exception as e:
+        logger.warning(f"Failed to invalidate profile vector {profile_hash}: {str(e)}")
+
+
+def cacheable_enrichments(user, items):
+    # Drops failed enrichments, which must not be cached or saved
+    kept = [(cache_key, full_data) for cache_key, full_data in items if not full_data.get(ENRICHMENT_FAILED_FIELD)]
+    if len(kept) < len(items):
+        logger.warning(f"Not caching {len(items) - len(kept)} failed enrichments for user {user.email}")
+    return kept
+
+def store_enriched_jobs(user, items):
+    # items: (cache_key, full_data) pairs for jobs that were just enriched
+    items = cacheable_enrichments(user, items)
+    if not items:
+        return
+
+    try:
+        # Save full data to Redis for next time, in a single round trip
+        pipe = redis_client.pipeline(transaction=False)
+        queue_enrichment_writes(pipe, items)
+        evict_enrichments(pipe.execute()[-1])
+    except Exception as e:
+        logger.error(f"Failed to cache {len(items)} enriched jobs for user {user.email}: {str(e)}", exc_info=True)
+
+    try:
+        save_job_matches(user, [full_data for _, full_data in items])
+    except Exception as e:
+        logger.error(f"Failed to save job matches for user {user.email}: {str(e)}", exc_info=True)
+
+
+def fetch_jobs_from_index(job_ids):
+    # Full job dicts from the job:<id> hashes; None for jobs no longer there
+    if not job_ids:
+        return []
+    pipe = redis_client.pipeline(transaction=False)
+    for job_id in job_ids:
+        pipe.hmget(job_key(job_id), JOB_HASH_FIELDS)
+        pipe.hmget(job_doc_key(job_id), JOB_DOC_FIELDS)
+    return jobs_from_index_replies(job_ids, pipe.execute())
+
+
+def jobs_from_index_replies(job_ids, replies):
+    # Pairs of job:<id> / jobdoc:<id> HMGET replies -> job dicts (None if gone)
+    return [
+        job_from_hash(job_id, {**dict(zip(JOB_HASH_FIELDS, values)), **dict(zip(JOB_DOC_FIELDS, doc_values))})
+        if values[0] is not None else None
+        for job_id, values, doc_values in zip(job_ids, replies[0::2], replies[1::2])
+    ]
+
+
+def job_from_hash(job_id, fields):
+    # Rebuild the job dict handed to the AI from the job:<id> and jobdoc:<id>
+    # hashes; the text fields are empty until the job is re-cached
+    return {
+        "id": job_id,
+        "title": fields["title"],
+        "company": fields["company"],
+        "location": fields["location"],
+        "type": fields["type"],
+        "posted": str(fields["posted"]),
+        "description": fields["description"] or "",
+        "tags": json.loads(fields["tags"] or "[]"),
+        "salary": fields["salary"],
+        "benefits": json.loads(fields["benefits"] or "[]"),
+    }
+
+
+def save_job_matches(user, jobs):
+    # One INSERT ... ON CONFLICT for the whole batch instead of a
+    # SELECT + UPDATE/INSERT per job
+    existing = {str(pk) for pk in Job.objects.filter(pk__in=[job["id"] for job in jobs]).values_list("pk", flat=True)}
+    profile_hash = user_profile_hash(user)
+    matches = [
+        JobMatch(
+            user=user,
+            job_id=job["id"],
+            profile_hash=profile_hash,
+            match_score=job.get("match_score", 0),
+            matched_skills=job.get("matched_skills", []),
+            missing_skills=job.get("missing_skills", []),
+            explanation=job.get("explanation", ""),
+        )
+        for job in jobs
+        if job["id"] in existing
+    ]
+    JobMatch.objects.bulk_create(
+        matches,
+        update_conflicts=True,
+        unique_fields=["user", "job"],
+        update_fields=["profile_hash", "match_score", "matched_skills", "missing_skills", "explanation", "updated_at"],
+    )
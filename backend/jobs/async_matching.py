@@ -0,0 +1,356 @@
+from asgiref.sync import sync_to_async
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from .ai_utils import (
+    CHAT_FALLBACK_REPLY,
+    ENRICHMENT_LRU_KEY,
+    FEED_LAST_SEEN_KEY,
+    JOB_DOC_FIELDS,
+    JOB_HASH_FIELDS,
+    apply_explanations,
+    attach_index_jobs,
+    build_feed_candidates,
+    cacheable_enrichments,
+    chat_prompt,
+    chunk_text,
+    cursor_offset,
+    deferred_feed_results,
+    encode_profile,
+    enrich_jobs_concurrently,
+    explanation_batches,
+    explanation_prompt,
+    feed_candidates_key,
+    filters_fingerprint,
+    float32_to_bytes,
+    jobs_from_index_replies,
+    knn_query,
+    page_cache_keys,
+    paginate_feed,
+    parse_ai_explanations,
+    parse_precomputed_feed,
+    precomputed_feed_key,
+    precomputed_feed_value,
+    queue_enrichment_writes,
+    prescore_deferred,
+    prescore_jobs,
+    profile_vector_key,
+    ranked_from_results,
+    save_job_matches,
+    user_profile_hash,
+)
+from .chat_cache import (
+    CHAT_CACHE_INDEX,
+    CHAT_CACHE_LRU_KEY,
+    cached_reply_from_results,
+    chat_cache_entry,
+    chat_lookup_query,
+    encode_chat_query,
+    ensure_chat_cache_index,
+    new_chat_cache_key,
+    profile_bucket,
+    record_evictions,
+    record_lookup,
+    record_store,
+)
+from .enrichment_queue import ENRICHMENT_STREAM, enrichment_entry, pending_marker_key
+from .job_vectors import JOB_CORPUS_VERSION_KEY, job_doc_key, job_key
+from .llm_gateway import agenerate_content
+from .redis_client import get_async_redis_client
+from .vector_codec import vector_to_bytes
+from .vector_index import JOB_INDEX_ALIAS
+import asyncio
+import json
+import logging
+import numpy as np
+import time
+from redis.exceptions import ResponseError
+
+# Async twins of the feed and chat paths in ai_utils, for the ASGI views.
+# Redis and Gemini calls are awaited instead of holding a thread, so one
+# process can keep many slow LLM requests in flight; the pure helpers
+# (pagination, scoring, prompts, parsing) are shared with the sync code.
+
+logger = logging.getLogger(__name__)
+
+# The embedding model is CPU-bound, so encodes run here rather than on the event loop
+embedding_executor = ThreadPoolExecutor(max_workers=settings.EMBEDDING_EXECUTOR_WORKERS, thread_name_prefix="embed")
+
+
+async def aget_profile_vector(user):
+    client = get_async_redis_client(binary=True)
+    key = profile_vector_key(user_profile_hash(user))
+    try:
+        cached = await client.get(key)
+        if cached:
+            return np.frombuffer(cached, dtype=np.float32)
+    except Exception as e:
+        logger.warning(f"Failed to read cached profile vector for user {user.email}: {str(e)}")
+
+    vector = await asyncio.get_running_loop().run_in_executor(embedding_executor, encode_profile, user)
+    try:
+        await client.set(key, float32_to_bytes(vector), ex=settings.PROFILE_VECTOR_CACHE_TTL or None)
+    except Exception as e:
+        logger.warning(f"Failed to cache profile vector for user {user.email}: {str(e)}")
+    return vector
+
+
+async def aget_ranked_candidates(user, profile_hash, filters):
+    client = get_async_redis_client()
+    if not filters:
+        stored, version = await client.mget(precomputed_feed_key(profile_hash), JOB_CORPUS_VERSION_KEY)
+        ranked = parse_precomputed_feed(stored, version)
+        if ranked is not None:
+            return ranked
+        version = int(version or 0)
+
+    key = feed_candidates_key(profile_hash, filters)
+    if filters:
+        cached = await client.get(key)
+        if cached:
+            return json.loads(cached)
+
+    user_vector = await aget_profile_vector(user)
+    results = await client.ft(JOB_INDEX_ALIAS).search(knn_query(filters), query_params={"vec": vector_to_bytes(user_vector)})
+    ranked = ranked_from_results(results)
+
+    if filters:
+        await client.set(key, json.dumps(ranked), ex=settings.FEED_CANDIDATES_TTL)
+    else:
+        await client.set(precomputed_feed_key(profile_hash), precomputed_feed_value(ranked, version),
+                         ex=settings.FEED_PRECOMPUTED_TTL or None)
+    return ranked
+
+
+async def afetch_jobs_from_index(job_ids):
+    if not job_ids:
+        return []
+    pipe = get_async_redis_client().pipeline(transaction=False)
+    for job_id in job_ids:
+        pipe.hmget(job_key(job_id), JOB_HASH_FIELDS)
+        pipe.hmget(job_doc_key(job_id), JOB_DOC_FIELDS)
+    return jobs_from_index_replies(job_ids, await pipe.execute())
+
+
+async def arecord_feed_activity(user_id):
+    try:
+        await get_async_redis_client().zadd(FEED_LAST_SEEN_KEY, {user_id: time.time()})
+    except Exception as e:
+        logger.warning(f"Failed to record feed activity for {user_id}: {str(e)}")
+
+
+async def atouch_enrichments(candidates):
+    hits = [candidate["cache_key"] for candidate in candidates if "data" in candidate]
+    if not hits:
+        return
+    try:
+        await get_async_redis_client().zadd(ENRICHMENT_LRU_KEY, {cache_key: time.time() for cache_key in hits}, xx=True)
+    except Exception as e:
+        logger.warning(f"Failed to refresh {len(hits)} cached enrichments: {str(e)}")
+
+
+async def astore_enriched_jobs(user, items):
+    items = cacheable_enrichments(user, items)
+    if not items:
+        return
+
+    try:
+        client = get_async_redis_client()
+        pipe = client.pipeline(transaction=False)
+        queue_enrichment_writes(pipe, items)
+        overflow = (await pipe.execute())[-1] - settings.ENRICHMENT_CACHE_MAX_ENTRIES
+        if overflow > 0:
+            evicted = [cache_key for cache_key, _ in await client.zpopmin(ENRICHMENT_LRU_KEY, overflow)]
+            if evicted:
+                await client.delete(*evicted)
+    except Exception as e:
+        logger.error(f"Failed to cache {len(items)} enriched jobs for user {user.email}: {str(e)}", exc_info=True)
+
+    try:
+        await sync_to_async(save_job_matches)(user, [full_data for _, full_data in items])
+    except Exception as e:
+        logger.error(f"Failed to save job matches for user {user.email}: {str(e)}", exc_info=True)
+
+
+async def aenqueue_enrichments(user, candidates):
+    if not candidates:
+        return 0
+    client = get_async_redis_client()
+
+    pipe = client.pipeline(transaction=False)
+    for candidate in candidates:
+        pipe.set(pending_marker_key(candidate["cache_key"]), 1, nx=True, ex=settings.ENRICHMENT_PENDING_TTL)
+    claimed = await pipe.execute()
+
+    new = [candidate for candidate, is_new in zip(candidates, claimed) if is_new]
+    if new:
+        pipe = client.pipeline(transaction=False)
+        for candidate in new:
+            pipe.xadd(ENRICHMENT_STREAM, enrichment_entry(user, candidate), maxlen=settings.ENRICHMENT_STREAM_MAXLEN, approximate=True)
+        await pipe.execute()
+    return len(new)
+
+
+async def aexplain_jobs_with_ai_batch(user, jobs, semaphore):
+    async with semaphore:
+        try:
+            response = await agenerate_content(
+                explanation_prompt(user, jobs),
+                settings.AI_ENRICHMENT_BATCH_TIMEOUT,
+                generation_config={"response_mime_type": "application/json"},
+            )
+            if not response or not response.text:
+                raise ValueError("Empty response from AI")
+        except Exception as e:
+            logger.error(f"AI explanation failed: {str(e) or type(e).__name__}", exc_info=True)
+            return {}
+    return parse_ai_explanations(response.text, jobs)
+
+
+async def ascore_jobs(user, jobs, distances):
+    if not settings.SKILL_PRESCORING_ENABLED:
+        # Full AI scoring has no async path; keep it off the event loop
+        return await sync_to_async(enrich_jobs_concurrently, thread_sensitive=False)(user, jobs)
+
+    scored, to_explain = prescore_jobs(user, jobs, distances)
+    if not to_explain:
+        return scored
+
+    semaphore = asyncio.Semaphore(settings.AI_ENRICHMENT_CONCURRENCY)
+    explanations = {}
+    for result in await asyncio.gather(*[
+        aexplain_jobs_with_ai_batch(user, batch, semaphore) for batch in explanation_batches(to_explain)
+    ]):
+        explanations.update(result)
+
+    apply_explanations(to_explain, explanations)
+    return scored
+
+
+async def amatch_user_to_jobs(user, page_size=10, cursor=None, defer_enrichment=False, filters=None):
+    # Same contract as ai_utils.match_user_to_jobs
+    profile_hash = user_profile_hash(user)
+    filters_hash = filters_fingerprint(filters)
+    offset = cursor_offset(cursor, profile_hash, filters_hash)
+
+    ranked = await aget_ranked_candidates(user, profile_hash, filters)
+    page, next_cursor = paginate_feed(ranked, offset, page_size, profile_hash, filters_hash)
+    cache_keys = page_cache_keys(user, page)
+
+    cached_values = await get_async_redis_client().mget(cache_keys) if cache_keys else []
+    candidates = build_feed_candidates(user, page, cache_keys, cached_values)
+    await atouch_enrichments(candidates)
+
+    misses = [candidate for candidate in candidates if "data" not in candidate]
+    candidates, misses = attach_index_jobs(
+        candidates, misses, await afetch_jobs_from_index([candidate["job_id"] for candidate in misses])
+    )
+
+    if defer_enrichment:
+        ready, waiting = prescore_deferred(user, misses)
+        await astore_enriched_jobs(user, ready)
+        await aenqueue_enrichments(user, waiting)
+        return {"results": deferred_feed_results(candidates, waiting), "next_cursor": next_cursor}
+
+    enriched = await ascore_jobs(
+        user,
+        [candidate["job"] for candidate in misses],
+        [candidate["distance"] for candidate in misses],
+    )
+    for candidate, result in zip(misses, enriched):
+        candidate["data"] = {**candidate["job"], **result}
+
+    await astore_enriched_jobs(user, [(candidate["cache_key"], candidate["data"]) for candidate in misses])
+    return {"results": [candidate["data"] for candidate in candidates], "next_cursor": next_cursor}
+
+
+async def alookup_chat_reply(message, user_profile):
+    # Async twin of chat_cache.lookup_chat_reply
+    if not settings.CHAT_CACHE_ENABLED:
+        return None, None
+    try:
+        vector = await asyncio.get_running_loop().run_in_executor(
+            embedding_executor, encode_chat_query, message, user_profile
+        )
+        role, _ = profile_bucket(user_profile)
+        client = get_async_redis_client()
+        try:
+            results = await client.ft(CHAT_CACHE_INDEX).search(
+                chat_lookup_query(role), query_params={"vec": vector.tobytes()}
+            )
+            hit = cached_reply_from_results(results)
+        except ResponseError as e:
+            logger.debug(f"Chat cache lookup failed: {str(e)}")
+            hit = None
+
+        pipe = client.pipeline(transaction=False)
+        record_lookup(pipe, hit)
+        await pipe.execute()
+        return (hit[1] if hit else None), vector
+    except Exception as e:
+        logger.warning(f"Chat cache lookup failed: {str(e)}")
+        return None, None
+
+
+async def astore_chat_reply(message, user_profile, vector, reply):
+    # Async twin of chat_cache.store_chat_reply
+    if vector is None or not reply:
+        return
+    try:
+        # Creates the index once per process
+        await sync_to_async(ensure_chat_cache_index, thread_sensitive=False)()
+        client = get_async_redis_client()
+        pipe = client.pipeline(transaction=False)
+        record_store(pipe, new_chat_cache_key(), chat_cache_entry(message, user_profile, vector, reply))
+        size = (await pipe.execute())[-1]
+
+        overflow = size - settings.CHAT_CACHE_MAX_ENTRIES
+        if overflow > 0:
+            evicted = [member for member, _ in await client.zpopmin(CHAT_CACHE_LRU_KEY, overflow)]
+            if evicted:
+                pipe = client.pipeline(transaction=False)
+                record_evictions(pipe, evicted)
+                await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to cache chat reply: {str(e)}")
+
+
+async def aget_ai_chat_response(message, user_profile):
+    cached, vector = await alookup_chat_reply(message, user_profile)
+    if cached:
+        return cached
+    try:
+        response = await agenerate_content(chat_prompt(message, user_profile), settings.AI_CHAT_TIMEOUT)
+        reply = response.text.strip()
+    except Exception as e:
+        logger.error(f"Error generating AI chat response: {str(e) or type(e).__name__}", exc_info=True)
+        return CHAT_FALLBACK_REPLY
+    await astore_chat_reply(message, user_profile, vector, reply)
+    return reply
+
+
+async def astream_ai_chat_response(message, user_profile):
+    # Async twin of ai_utils.stream_ai_chat_response; the deadline also
+    # covers waiting for each next chunk
+    cached, vector = await alookup_chat_reply(message, user_profile)
+    if cached:
+        yield cached
+        return
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.AI_CHAT_TIMEOUT
+    response = await agenerate_content(chat_prompt(message, user_profile), settings.AI_CHAT_TIMEOUT, stream=True)
+    chunks = response.__aiter__()
+    parts = []
+    while True:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            raise TimeoutError("Chat reply took too long")
+        try:
+            chunk = await asyncio.wait_for(chunks.__anext__(), remaining)
+        except StopAsyncIteration:
+            break
+        text = chunk_text(chunk)
+        if text:
+            parts.append(text)
+            yield text
+    await astore_chat_reply(message, user_profile, vector, "".join(parts).strip())
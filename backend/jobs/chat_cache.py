@@ -0,0 +1,197 @@
+from django.conf import settings
+from redis.commands.search.field import TagField, TextField, VectorField
+from redis.commands.search.index_definition import IndexDefinition, IndexType
+from redis.commands.search.query import Query
+from redis.exceptions import ResponseError
+from .model_registry import get_embedding_model
+from .redis_client import redis_client
+from .skill_scoring import normalize_skill
+from .vector_index import EMBEDDING_DIM, tag_clause
+import numpy as np
+import logging
+import re
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Semantic cache of assistant replies: past (question, profile bucket) pairs
+# are embedded into their own vector index, and a close enough match returns
+# the stored reply instead of calling Gemini. Entries expire after
+# CHAT_CACHE_TTL and the least recently used ones are evicted beyond
+# CHAT_CACHE_MAX_ENTRIES.
+CHAT_CACHE_INDEX = "chat_cache_idx"
+CHAT_CACHE_PREFIX = "chatcache:entry:"
+# Outside the entry prefix, so neither is picked up by the index
+CHAT_CACHE_LRU_KEY = "chatcache:lru"
+CHAT_CACHE_STATS_KEY = "chatcache:stats"
+
+_index_ready = False
+
+
+def profile_bucket(user_profile):
+    # Role and normalized skills; users in the same bucket can share answers
+    role = re.sub(r"\s+", " ", str(user_profile.get("role") or "developer").strip().lower())
+    skills = sorted({normalize_skill(skill) for skill in user_profile.get("skills") or []} - {""})
+    return role, skills
+
+
+def chat_cache_text(message, user_profile):
+    # The bucket is embedded with the question, so the same question from a
+    # very different skill set lands further away
+    role, skills = profile_bucket(user_profile)
+    return f"Role: {role}\nSkills: {', '.join(skills)}\nQuestion: {message.strip()}"
+
+
+def encode_chat_query(message, user_profile):
+    return np.asarray(
+        get_embedding_model().encode(chat_cache_text(message, user_profile), normalize_embeddings=True),
+        dtype=np.float32,
+    )
+
+
+def chat_cache_schema():
+    return [
+        TagField("role"),
+        TextField("message"),
+        VectorField("embedding", "FLAT", {"TYPE": "FLOAT32", "DIM": EMBEDDING_DIM, "DISTANCE_METRIC": "COSINE"}),
+    ]
+
+
+def chat_cache_definition():
+    return IndexDefinition(prefix=[CHAT_CACHE_PREFIX], index_type=IndexType.HASH)
+
+
+def ensure_chat_cache_index():
+    global _index_ready
+    if _index_ready:
+        return
+    try:
+        redis_client.ft(CHAT_CACHE_INDEX).create_index(chat_cache_schema(), definition=chat_cache_definition())
+    except ResponseError as e:
+        if "already exists" not in str(e).lower():
+            raise
+    _index_ready = True
+
+
+def chat_lookup_query(role):
+    # Nearest past question from the same role
+    return (
+        Query(f"{tag_clause('role', [role])}=>[KNN 1 @embedding $vec AS score]")
+        .return_fields("reply", "score")
+        .dialect(2)
+    )
+
+
+def cached_reply_from_results(results):
+    # (entry key, reply) for a close enough match, else None
+    if not results.docs:
+        return None
+    doc = results.docs[0]
+    if 1.0 - float(doc.score) < settings.CHAT_CACHE_SIMILARITY_THRESHOLD:
+        return None
+    return doc.id, doc.reply
+
+
+def chat_cache_entry(message, user_profile, vector, reply):
+    role, _ = profile_bucket(user_profile)
+    return {
+        "role": role,
+        "message": message.strip(),
+        "reply": reply,
+        "created": int(time.time()),
+        "embedding": np.asarray(vector, dtype=np.float32).tobytes(),
+    }
+
+
+def new_chat_cache_key():
+    return f"{CHAT_CACHE_PREFIX}{uuid.uuid4().hex}"
+
+
+def record_lookup(pipe, hit):
+    pipe.hincrby(CHAT_CACHE_STATS_KEY, "hits" if hit else "misses", 1)
+    if hit:
+        # Refresh its LRU position
+        pipe.zadd(CHAT_CACHE_LRU_KEY, {hit[0]: time.time()})
+
+
+def record_store(pipe, key, entry):
+    now = time.time()
+    pipe.hset(key, mapping=entry)
+    if settings.CHAT_CACHE_TTL:
+        pipe.expire(key, settings.CHAT_CACHE_TTL)
+        # Entries that expired on their own no longer need an LRU slot
+        pipe.zremrangebyscore(CHAT_CACHE_LRU_KEY, "-inf", now - settings.CHAT_CACHE_TTL)
+    pipe.zadd(CHAT_CACHE_LRU_KEY, {key: now})
+    pipe.hincrby(CHAT_CACHE_STATS_KEY, "stores", 1)
+    pipe.zcard(CHAT_CACHE_LRU_KEY)
+
+
+def record_evictions(pipe, evicted):
+    pipe.delete(*evicted)
+    pipe.hincrby(CHAT_CACHE_STATS_KEY, "evictions", len(evicted))
+
+
+def lookup_chat_reply(message, user_profile):
+    # Returns (cached reply or None, query vector). The vector is handed back
+    # so a miss can be stored without encoding the question twice; it is None
+    # when the cache is off or unavailable, and then nothing is stored.
+    if not settings.CHAT_CACHE_ENABLED:
+        return None, None
+    try:
+        vector = encode_chat_query(message, user_profile)
+        role, _ = profile_bucket(user_profile)
+        try:
+            results = redis_client.ft(CHAT_CACHE_INDEX).search(
+                chat_lookup_query(role), query_params={"vec": vector.tobytes()}
+            )
+            hit = cached_reply_from_results(results)
+        except ResponseError as e:
+            # Index not created yet: nothing has been cached
+            logger.debug(f"Chat cache lookup failed: {str(e)}")
+            hit = None
+
+        pipe = redis_client.pipeline(transaction=False)
+        record_lookup(pipe, hit)
+        pipe.execute()
+        return (hit[1] if hit else None), vector
+    except Exception as e:
+        logger.warning(f"Chat cache lookup failed: {str(e)}")
+        return None, None
+
+
+def store_chat_reply(message, user_profile, vector, reply):
+    if vector is None or not reply:
+        return
+    try:
+        ensure_chat_cache_index()
+        pipe = redis_client.pipeline(transaction=False)
+        record_store(pipe, new_chat_cache_key(), chat_cache_entry(message, user_profile, vector, reply))
+        size = pipe.execute()[-1]
+
+        overflow = size - settings.CHAT_CACHE_MAX_ENTRIES
+        if overflow > 0:
+            evicted = [member for member, _ in redis_client.zpopmin(CHAT_CACHE_LRU_KEY, overflow)]
+            if evicted:
+                pipe = redis_client.pipeline(transaction=False)
+                record_evictions(pipe, evicted)
+                pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to cache chat reply: {str(e)}")
+
+
+def chat_cache_stats():
+    stats = {name: int(value) for name, value in redis_client.hgetall(CHAT_CACHE_STATS_KEY).items()}
+    hits, misses = stats.get("hits", 0), stats.get("misses", 0)
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        "stores": stats.get("stores", 0),
+        "evictions": stats.get("evictions", 0),
+        "entries": redis_client.zcard(CHAT_CACHE_LRU_KEY),
+    }
+
+
+def reset_chat_cache_stats():
+    redis_client.delete(CHAT_CACHE_STATS_KEY)
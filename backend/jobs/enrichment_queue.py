@@ -0,0 +1,79 @@
+from django.conf import settings
+from redis.exceptions import ResponseError
+from .redis_client import redis_client
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Redis Stream of (user, job) pairs waiting for AI enrichment, consumed by
+# `manage.py run_enrichment_worker`.
+ENRICHMENT_STREAM = "enrichment:stream"
+ENRICHMENT_GROUP = "enrichment-workers"
+
+
+def pending_marker_key(cache_key):
+    return f"enrichment:pending:{cache_key}"
+
+
+def enrichment_entry(user, candidate):
+    return {
+        "user_id": user.id,
+        "job_id": candidate["job"]["id"],
+        "cache_key": candidate["cache_key"],
+        "distance": candidate["distance"],
+    }
+
+
+def enqueue_enrichments(user, candidates):
+    # Queue each cache miss once; repeated feed polls while the worker is
+    # busy must not pile up duplicate entries.
+    if not candidates:
+        return 0
+
+    pipe = redis_client.pipeline(transaction=False)
+    for candidate in candidates:
+        pipe.set(pending_marker_key(candidate["cache_key"]), 1, nx=True, ex=settings.ENRICHMENT_PENDING_TTL)
+    claimed = pipe.execute()
+
+    pipe = redis_client.pipeline(transaction=False)
+    queued = 0
+    for candidate, is_new in zip(candidates, claimed):
+        if not is_new:
+            continue
+        pipe.xadd(ENRICHMENT_STREAM, enrichment_entry(user, candidate), maxlen=settings.ENRICHMENT_STREAM_MAXLEN, approximate=True)
+        queued += 1
+    if queued:
+        pipe.execute()
+    return queued
+
+
+def ensure_consumer_group():
+    try:
+        redis_client.xgroup_create(ENRICHMENT_STREAM, ENRICHMENT_GROUP, id="0", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+def read_enrichment_batch(consumer, count, block_ms, min_idle_ms):
+    # Reclaim entries a crashed worker left unacknowledged before reading new ones
+    claimed = redis_client.xautoclaim(
+        ENRICHMENT_STREAM, ENRICHMENT_GROUP, consumer, min_idle_time=min_idle_ms, count=count
+    )[1]
+    if claimed:
+        return claimed
+
+    response = redis_client.xreadgroup(
+        ENRICHMENT_GROUP, consumer, {ENRICHMENT_STREAM: ">"}, count=count, block=block_ms
+    )
+    return response[0][1] if response else []
+
+
+def acknowledge(entries):
+    if not entries:
+        return
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.xack(ENRICHMENT_STREAM, ENRICHMENT_GROUP, *[entry_id for entry_id, _ in entries])
+    pipe.xdel(ENRICHMENT_STREAM, *[entry_id for entry_id, _ in entries])
+    pipe.delete(*[pending_marker_key(fields["cache_key"]) for _, fields in entries])
+    pipe.execute()
@@ -0,0 +1,49 @@
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from functools import reduce
+from operator import or_
+from .job_vectors import delete_job_vectors, write_job_vectors
+from .models import Job, JobIndexOutbox
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def queue_job_index_updates(job_ids, deleted=False):
+    # Called inside the transaction that changed the jobs, so the queue can
+    # never miss a committed change
+    job_ids = list(dict.fromkeys(job_ids))
+    if not job_ids:
+        return
+    now = timezone.now()
+    JobIndexOutbox.objects.bulk_create(
+        [JobIndexOutbox(job_id=job_id, deleted=deleted, queued_at=now) for job_id in job_ids],
+        update_conflicts=True,
+        unique_fields=["job_id"],
+        update_fields=["deleted", "queued_at"],
+    )
+
+
+def sync_job_index_batch(batch_size=100, embed_batch_size=64):
+    # Applies the oldest queued entries to Redis and removes them from the
+    # outbox. Returns (indexed, embedded, deleted) counts.
+    entries = list(JobIndexOutbox.objects.order_by("queued_at")[:batch_size])
+    if not entries:
+        return 0, 0, 0
+
+    upserts = [entry.job_id for entry in entries if not entry.deleted]
+    jobs = Job.objects.in_bulk(upserts)
+    # Jobs removed after they were queued are treated as deletes
+    removed = [entry.job_id for entry in entries if entry.deleted or entry.job_id not in jobs]
+
+    embedded = write_job_vectors(list(jobs.values()), batch_size=embed_batch_size)
+    delete_job_vectors(removed)
+
+    # Only clear the entries as they were read; a job re-queued while this
+    # batch was running keeps its newer row and is picked up next time
+    processed = reduce(or_, (Q(job_id=entry.job_id, queued_at=entry.queued_at) for entry in entries))
+    with transaction.atomic():
+        JobIndexOutbox.objects.filter(processed).delete()
+
+    return len(jobs), embedded, len(removed)
@@ -0,0 +1,117 @@
+from django.db import transaction
+from django.db.models import Q
+from .index_sync import queue_job_index_updates
+from .models import Job, job_fingerprint
+import logging
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_FIELDS = ['title', 'company', 'location', 'type', 'posted', 'description']
+JOB_DATA_FIELDS = ['title', 'company', 'location', 'type', 'posted', 'description', 'tags', 'salary', 'benefits']
+
+
+def save_job_chunk(rows, near_duplicate=None):
+    # Upserts a chunk of normalized job dicts in one transaction with at most
+    # two INSERT ... ON CONFLICT statements. `near_duplicate` is an optional
+    # callable that returns True for new jobs that should be skipped.
+    # Returns counts of inserted, updated and skipped rows; rows identical to
+    # the stored job count as skipped and are not written.
+    counts = {"inserted": 0, "updated": 0, "skipped": 0}
+
+    valid = []
+    seen = set()
+    for row in rows:
+        if not all(row.get(field) for field in REQUIRED_FIELDS):
+            counts["skipped"] += 1
+            continue
+        fingerprint = job_fingerprint(row["title"], row["company"], row["location"])
+        external_id = row.get("external_id") or None
+        # The same posting twice in one chunk
+        if fingerprint in seen or (external_id and external_id in seen):
+            counts["skipped"] += 1
+            continue
+        seen.update(key for key in (fingerprint, external_id) if key)
+        valid.append((row, external_id, fingerprint))
+
+    if not valid:
+        return counts
+
+    external_ids = [external_id for _, external_id, _ in valid if external_id]
+    fingerprints = [fingerprint for _, _, fingerprint in valid]
+    existing = Job.objects.filter(Q(external_id__in=external_ids) | Q(fingerprint__in=fingerprints))
+    by_external_id = {}
+    by_fingerprint = {}
+    for stored in existing.values("external_id", "fingerprint", *JOB_DATA_FIELDS):
+        if stored["external_id"]:
+            by_external_id[stored["external_id"]] = stored
+        if stored["fingerprint"]:
+            by_fingerprint[stored["fingerprint"]] = stored
+
+    def unchanged(job, stored):
+        # Feeds resend every posting on each run; rewriting an identical row
+        # would only re-queue it for the vector indexer
+        return all(getattr(job, field) == stored[field] for field in JOB_DATA_FIELDS + ["external_id"])
+
+    # Rows keyed on the source id (new rows and known ids) and rows that only
+    # match an existing posting by fingerprint
+    upsert_on_external_id = []
+    upsert_on_fingerprint = []
+    for row, external_id, fingerprint in valid:
+        job = Job(**{field: row.get(field) for field in JOB_DATA_FIELDS}, external_id=external_id, fingerprint=fingerprint)
+
+        if external_id and external_id in by_external_id:
+            owner = by_fingerprint.get(fingerprint, {"external_id": external_id})["external_id"]
+            if owner != external_id or unchanged(job, by_external_id[external_id]):
+                # Unchanged, or the updated posting now collides with a different job
+                counts["skipped"] += 1
+                continue
+            upsert_on_external_id.append(job)
+            counts["updated"] += 1
+        elif fingerprint in by_fingerprint:
+            owner = by_fingerprint[fingerprint]["external_id"]
+            if owner and external_id and owner != external_id:
+                # Same posting re-listed under a new id
+                counts["skipped"] += 1
+                continue
+            if owner and not external_id:
+                job.external_id = owner
+            if unchanged(job, by_fingerprint[fingerprint]):
+                counts["skipped"] += 1
+                continue
+            upsert_on_fingerprint.append(job)
+            counts["updated"] += 1
+        elif near_duplicate is not None and near_duplicate(row):
+            counts["skipped"] += 1
+        else:
+            upsert_on_external_id.append(job)
+            counts["inserted"] += 1
+
+    written = upsert_on_external_id + upsert_on_fingerprint
+    if not written:
+        return counts
+
+    with transaction.atomic():
+        if upsert_on_external_id:
+            Job.objects.bulk_create(
+                upsert_on_external_id,
+                update_conflicts=True,
+                unique_fields=["external_id"],
+                update_fields=JOB_DATA_FIELDS + ["fingerprint"],
+            )
+        if upsert_on_fingerprint:
+            Job.objects.bulk_create(
+                upsert_on_fingerprint,
+                update_conflicts=True,
+                unique_fields=["fingerprint"],
+                update_fields=JOB_DATA_FIELDS + ["external_id"],
+            )
+
+        # bulk_create skips post_save, so queue the written rows for the vector
+        # indexer here. Upserted rows keep their existing primary key, so look
+        # them up by the unique keys they were written under.
+        queue_job_index_updates(Job.objects.filter(
+            Q(external_id__in=[job.external_id for job in written if job.external_id])
+            | Q(fingerprint__in=[job.fingerprint for job in written])
+        ).values_list("id", flat=True))
+
+    return counts
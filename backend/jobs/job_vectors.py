@@ -0,0 +1,237 @@
+from .models import Job
+from .model_registry import embedding_model_id, get_embedding_model
+from .redis_client import redis_binary_client, redis_client
+from .vector_codec import bytes_to_vector, encode_vectors, vector_format
+from .vector_index import INDEX_META_KEY, JOB_KEY_PREFIX
+from datetime import datetime, time as dt_time, timezone as dt_timezone
+import numpy as np
+import hashlib
+import json
+import re
+
+# Bump when the set of fields written to job:<id> changes, so existing
+# hashes get rewritten even though their content hash is unchanged.
+JOB_DOC_VERSION = "4"
+
+# Bulky text lives in jobdoc:<id>, outside the index prefix, so the indexed
+# job:<id> hash only carries what is filtered on or shown in a feed card
+JOB_DOC_PREFIX = "jobdoc:"
+
+# Counts job vectors added, re-embedded or removed (metadata-only rewrites
+# don't move it), so results computed against the corpus (precomputed
+# feeds) can tell how far behind they are
+JOB_CORPUS_VERSION_KEY = f"{INDEX_META_KEY}:corpus_version"
+
+
+def job_key(job_id):
+    return f"{JOB_KEY_PREFIX}{job_id}"
+
+
+def job_doc_key(job_id):
+    return f"{JOB_DOC_PREFIX}{job_id}"
+
+
+def corpus_version():
+    return int(redis_client.get(JOB_CORPUS_VERSION_KEY) or 0)
+
+
+def job_to_text(job):
+    return f"{job.title} {job.description} {', '.join(job.tags)}"
+
+
+def posted_timestamp(job):
+    # NUMERIC index fields need a number, not an ISO date string
+    return int(datetime.combine(job.posted, dt_time.min, tzinfo=dt_timezone.utc).timestamp())
+
+
+def salary_floor(salary):
+    # Lowest number in a free-text salary such as "$80k - $120k"; None if there is none
+    amounts = []
+    for number, thousands in re.findall(r"(\d[\d,]*(?:\.\d+)?)\s*([kK])?", salary or ""):
+        amount = float(number.replace(",", ""))
+        amounts.append(amount * 1000 if thousands else amount)
+    amounts = [amount for amount in amounts if amount >= 1000]
+    return int(min(amounts)) if amounts else None
+
+
+def job_content_hash(job):
+    # Fingerprint of everything that feeds the embedding text
+    payload = json.dumps([job.title, job.description, job.tags], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def iter_job_chunks(chunk_size):
+    # Keyset pagination on the primary key: each chunk is a fresh, bounded query
+    # so memory stays flat no matter how large the Job table grows.
+    queryset = Job.objects.order_by("pk")
+    last_pk = None
+    while True:
+        page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        chunk = list(page[:chunk_size].iterator(chunk_size=chunk_size))
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1].pk
+
+
+def job_metadata(job):
+    # Everything in job:<id> except the vector and its bookkeeping fields
+    fields = {
+        "id": str(job.id),
+        "title": job.title,
+        "company": job.company,
+        "location": job.location,
+        "type": job.type,
+        "posted": str(job.posted),
+        "posted_ts": posted_timestamp(job),
+        "tag_set": "|".join(tag.strip().lower() for tag in job.tags if tag.strip()),
+        "salary": job.salary,
+    }
+    # Jobs without a parsable salary drop out of salary filters
+    salary_min = salary_floor(job.salary)
+    if salary_min is not None:
+        fields["salary_min"] = salary_min
+    return fields
+
+
+def job_document(job):
+    return {
+        "description": job.description,
+        "tags": json.dumps(job.tags),
+        "benefits": json.dumps(job.benefits),
+    }
+
+
+def job_metadata_hash(metadata, document):
+    # Fingerprint of every stored field outside the embedding, so a change to
+    # e.g. salary or location alone still reaches the index
+    payload = json.dumps([metadata, document], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def write_job_vectors(jobs, batch_size=64, full=False):
+    # Writes the given jobs to their job:<id> and jobdoc:<id> hashes. Jobs are
+    # re-embedded when their stored content hash, model, field layout or
+    # vector format differ (or `full` is set); jobs where only other fields
+    # changed get those rewritten without an encode; the rest are left alone.
+    # Returns the number of jobs re-embedded.
+    model_id = embedding_model_id()
+    stored_format = vector_format()
+    prepared = []
+    for job in jobs:
+        metadata, document = job_metadata(job), job_document(job)
+        prepared.append((job, job_content_hash(job), metadata, document, job_metadata_hash(metadata, document)))
+
+    if full:
+        changed, touched = prepared, []
+    else:
+        pipe = redis_client.pipeline(transaction=False)
+        for job, *_ in prepared:
+            pipe.hmget(job_key(job.id), "content_hash", "embedding_model", "doc_version", "vector_format", "meta_hash")
+        changed, touched = [], []
+        for item, stored_fields in zip(prepared, pipe.execute()):
+            _, content_hash, _, _, meta_hash = item
+            if stored_fields[:4] != [content_hash, model_id, JOB_DOC_VERSION, stored_format]:
+                changed.append(item)
+            elif stored_fields[4] != meta_hash:
+                touched.append(item)
+
+    if not changed and not touched:
+        return 0
+
+    encoded_vectors = []
+    if changed:
+        encoded_vectors = encode_vectors(get_embedding_model().encode(
+            [job_to_text(job) for job, *_ in changed],
+            batch_size=batch_size,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        ))
+
+    # One round trip per batch instead of one per job
+    pipe = redis_client.pipeline(transaction=True)
+    for (job, content_hash, metadata, document, meta_hash), encoded in zip(changed, encoded_vectors):
+        redis_key = job_key(job.id)
+        # Each hash is replaced whole, so fields from an older layout don't linger
+        pipe.delete(redis_key)
+        pipe.hset(redis_key, mapping={
+            **metadata,
+            "content_hash": content_hash,
+            "embedding_model": model_id,
+            "doc_version": JOB_DOC_VERSION,
+            "vector_format": stored_format,
+            "meta_hash": meta_hash,
+            "embedding": encoded,
+        })
+        pipe.hset(job_doc_key(job.id), mapping=document)
+    for job, _, metadata, document, meta_hash in touched:
+        redis_key = job_key(job.id)
+        pipe.hset(redis_key, mapping={**metadata, "meta_hash": meta_hash})
+        if "salary_min" not in metadata:
+            pipe.hdel(redis_key, "salary_min")
+        pipe.hset(job_doc_key(job.id), mapping=document)
+    if changed:
+        pipe.incrby(JOB_CORPUS_VERSION_KEY, len(changed))
+    pipe.execute()
+
+    return len(changed)
+
+
+def delete_job_vectors(job_ids):
+    # Returns the number of job vectors removed
+    job_ids = list(job_ids)
+    if not job_ids:
+        return 0
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.delete(*[job_key(job_id) for job_id in job_ids])
+    pipe.delete(*[job_doc_key(job_id) for job_id in job_ids])
+    removed = pipe.execute()[0]
+    if removed:
+        redis_client.incrby(JOB_CORPUS_VERSION_KEY, removed)
+    return removed
+
+
+def delete_stale_job_keys(live_ids, batch_size=1000):
+    # Remove cached vectors for jobs that no longer exist in the database
+    deleted = 0
+    stale = []
+    for key in redis_client.scan_iter(match=f"{JOB_KEY_PREFIX}*", count=batch_size):
+        job_id = key.split(":", 1)[1]
+        if job_id not in live_ids:
+            stale.append(job_id)
+        if len(stale) >= batch_size:
+            deleted += delete_job_vectors(stale)
+            stale = []
+    if stale:
+        deleted += delete_job_vectors(stale)
+    return deleted
+
+
+def load_job_matrix(batch_size=1000):
+    # Every stored job vector as (job_ids, float32 matrix with unit-length
+    # rows), in the stored format (see jobs/vector_codec.py)
+    job_ids, rows = [], []
+
+    def flush(keys):
+        pipe = redis_binary_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.hget(key, "embedding")
+        for key, data in zip(keys, pipe.execute()):
+            if data:
+                job_ids.append(key.decode().split(":", 1)[1])
+                rows.append(bytes_to_vector(data))
+
+    keys = []
+    for key in redis_binary_client.scan_iter(match=f"{JOB_KEY_PREFIX}*".encode(), count=batch_size):
+        keys.append(key)
+        if len(keys) >= batch_size:
+            flush(keys)
+            keys = []
+    if keys:
+        flush(keys)
+
+    if not rows:
+        return [], np.zeros((0, 0), dtype=np.float32)
+    matrix = np.vstack(rows)
+    matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+    return job_ids, matrix
@@ -0,0 +1,344 @@
+from django.conf import settings
+from .model_registry import get_gemini_model
+from .redis_client import get_async_redis_client, redis_client
+import asyncio
+import logging
+import random
+import threading
+import time
+import weakref
+
+logger = logging.getLogger(__name__)
+
+# Every Gemini call goes through one gateway per process:
+#   - a token bucket caps the request rate (per process, or shared by all
+#     workers through Redis with LLM_RATE_LIMIT_BACKEND=redis)
+#   - at most LLM_MAX_CONCURRENCY calls are in flight
+#   - transient errors (quota, 5xx, timeouts) are retried with jittered
+#     exponential backoff, within the call's timeout and a process-wide
+#     retry budget so retries can't multiply load during an outage
+#   - after LLM_CIRCUIT_FAILURE_THRESHOLD consecutive transient failures the
+#     circuit opens and calls fail fast for LLM_CIRCUIT_RESET_TIMEOUT seconds
+
+# google.api_core exception names worth retrying; matched by name so this
+# module doesn't import the SDK
+RETRYABLE_ERROR_NAMES = {
+    "ResourceExhausted",
+    "TooManyRequests",
+    "ServiceUnavailable",
+    "InternalServerError",
+    "DeadlineExceeded",
+    "GatewayTimeout",
+}
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class LLMUnavailableError(Exception):
+    # The call was not attempted: circuit open, rate limit or concurrency
+    # slot not available before the deadline
+    pass
+
+
+def is_retryable(error):
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    if type(error).__name__ in RETRYABLE_ERROR_NAMES:
+        return True
+    return getattr(error, "code", None) in RETRYABLE_STATUS_CODES
+
+
+class TokenBucket:
+    # In-process token bucket: `rate` tokens per second, up to `capacity`
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def try_acquire(self):
+        # 0 when a token was taken, else seconds until one is available
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    async def atry_acquire(self):
+        return self.try_acquire()
+
+
+# Same bucket kept in a Redis hash, so every worker shares one limit.
+# Redis TIME is used so workers with skewed clocks agree.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+
+class RedisTokenBucket:
+    def __init__(self, key, rate, capacity):
+        self.key = key
+        self.rate = rate
+        self.capacity = capacity
+
+    def try_acquire(self):
+        return float(redis_client.eval(TOKEN_BUCKET_SCRIPT, 1, self.key, self.rate, self.capacity))
+
+    async def atry_acquire(self):
+        return float(await get_async_redis_client().eval(TOKEN_BUCKET_SCRIPT, 1, self.key, self.rate, self.capacity))
+
+
+class RetryBudget:
+    # Retries may add at most `ratio` extra calls on top of first attempts:
+    # each call deposits `ratio`, each retry withdraws one (capped at
+    # `max_balance` so a quiet period can't bank a retry storm)
+    def __init__(self, ratio, max_balance=10.0):
+        self.ratio = ratio
+        self.max_balance = max_balance
+        self.balance = max_balance
+        self.lock = threading.Lock()
+
+    def deposit(self):
+        with self.lock:
+            self.balance = min(self.max_balance, self.balance + self.ratio)
+
+    def withdraw(self):
+        with self.lock:
+            if self.balance < 1:
+                return False
+            self.balance -= 1
+            return True
+
+
+class CircuitBreaker:
+    # closed -> open after `failure_threshold` consecutive failures; after
+    # `reset_timeout` one probe call is let through (half-open) and its
+    # outcome closes or re-opens the circuit. A probe that never reports back
+    # (e.g. it was rate limited or cancelled) expires after `reset_timeout`.
+    def __init__(self, failure_threshold, reset_timeout, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started = None
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return True
+            now = self.clock()
+            if state == "half-open" and (self.probe_started is None or now - self.probe_started >= self.reset_timeout):
+                self.probe_started = now
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probe_started = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.probe_started is not None or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.warning(f"LLM circuit opened after {self.failures} consecutive failures")
+                self.opened_at = self.clock()
+            self.probe_started = None
+
+
+class LLMGateway:
+    def __init__(self, get_model, rate_limiter, breaker, retry_budget, max_concurrency, max_retries,
+                 base_delay, max_delay, clock=time.monotonic, sleep=time.sleep, async_sleep=asyncio.sleep):
+        self.get_model = get_model
+        self.rate_limiter = rate_limiter
+        self.breaker = breaker
+        self.retry_budget = retry_budget
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.clock = clock
+        self.sleep = sleep
+        self.async_sleep = async_sleep
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        # asyncio semaphores are bound to their event loop
+        self._async_slots = weakref.WeakKeyDictionary()
+
+    def backoff(self, attempt):
+        # "Full jitter": uniform over [0, capped exponential delay]
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def check_circuit(self):
+        if not self.breaker.allow():
+            raise LLMUnavailableError("LLM circuit is open")
+
+    def after_failure(self, error, attempt, deadline):
+        # Seconds to wait before retrying; re-raises when the call is done for
+        if not is_retryable(error):
+            # The service answered (e.g. a rejected prompt); not an outage
+            self.breaker.record_success()
+            raise error
+        self.breaker.record_failure()
+        if attempt >= self.max_retries:
+            raise error
+        delay = self.backoff(attempt)
+        if self.clock() + delay >= deadline or not self.retry_budget.withdraw():
+            raise error
+        logger.warning(f"LLM call failed ({type(error).__name__}), retrying in {delay:.2f}s")
+        return delay
+
+    def acquire_token(self, deadline):
+        while True:
+            wait = self.rate_limiter.try_acquire()
+            if not wait:
+                return
+            if self.clock() + wait >= deadline:
+                raise LLMUnavailableError("LLM rate limit reached")
+            self.sleep(wait)
+
+    async def aacquire_token(self, deadline):
+        while True:
+            wait = await self.rate_limiter.atry_acquire()
+            if not wait:
+                return
+            if self.clock() + wait >= deadline:
+                raise LLMUnavailableError("LLM rate limit reached")
+            await self.async_sleep(wait)
+
+    def generate(self, prompt, timeout, **kwargs):
+        # model.generate_content with the gateway's limits; `timeout` bounds
+        # the whole call, including queueing and retries
+        deadline = self.clock() + timeout
+        if not self.slots.acquire(timeout=timeout):
+            raise LLMUnavailableError("No free LLM concurrency slot")
+        try:
+            self.retry_budget.deposit()
+            attempt = 0
+            while True:
+                self.check_circuit()
+                self.acquire_token(deadline)
+                try:
+                    response = self.get_model().generate_content(
+                        prompt, request_options={"timeout": max(0.0, deadline - self.clock())}, **kwargs
+                    )
+                except Exception as e:
+                    delay = self.after_failure(e, attempt, deadline)
+                    attempt += 1
+                    self.sleep(delay)
+                    continue
+                self.breaker.record_success()
+                return response
+        finally:
+            self.slots.release()
+
+    def async_slots(self):
+        loop = asyncio.get_running_loop()
+        if loop not in self._async_slots:
+            self._async_slots[loop] = asyncio.Semaphore(self.max_concurrency)
+        return self._async_slots[loop]
+
+    async def agenerate(self, prompt, timeout, **kwargs):
+        # Async twin of generate, using generate_content_async
+        deadline = self.clock() + timeout
+        slots = self.async_slots()
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout)
+        except asyncio.TimeoutError:
+            raise LLMUnavailableError("No free LLM concurrency slot")
+        try:
+            self.retry_budget.deposit()
+            attempt = 0
+            while True:
+                self.check_circuit()
+                await self.aacquire_token(deadline)
+                try:
+                    remaining = max(0.0, deadline - self.clock())
+                    response = await asyncio.wait_for(
+                        self.get_model().generate_content_async(
+                            prompt, request_options={"timeout": remaining}, **kwargs
+                        ),
+                        remaining,
+                    )
+                except Exception as e:
+                    delay = self.after_failure(e, attempt, deadline)
+                    attempt += 1
+                    await self.async_sleep(delay)
+                    continue
+                self.breaker.record_success()
+                return response
+        finally:
+            slots.release()
+
+
+LLM_RATE_LIMIT_KEY = "llm:rate_limit"
+
+_gateway_lock = threading.Lock()
+_gateway = None
+
+
+def build_rate_limiter():
+    rate = settings.LLM_RATE_LIMIT_PER_MINUTE / 60.0
+    if settings.LLM_RATE_LIMIT_BACKEND == "redis":
+        return RedisTokenBucket(LLM_RATE_LIMIT_KEY, rate, settings.LLM_RATE_LIMIT_BURST)
+    if settings.LLM_RATE_LIMIT_BACKEND == "local":
+        return TokenBucket(rate, settings.LLM_RATE_LIMIT_BURST)
+    raise ValueError(f"Unknown LLM rate limit backend: {settings.LLM_RATE_LIMIT_BACKEND}")
+
+
+def get_llm_gateway():
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway(
+                    get_gemini_model,
+                    build_rate_limiter(),
+                    CircuitBreaker(settings.LLM_CIRCUIT_FAILURE_THRESHOLD, settings.LLM_CIRCUIT_RESET_TIMEOUT),
+                    RetryBudget(settings.LLM_RETRY_BUDGET_RATIO),
+                    settings.LLM_MAX_CONCURRENCY,
+                    settings.LLM_MAX_RETRIES,
+                    settings.LLM_RETRY_BASE_DELAY,
+                    settings.LLM_RETRY_MAX_DELAY,
+                )
+    return _gateway
+
+
+def generate_content(prompt, timeout, **kwargs):
+    return get_llm_gateway().generate(prompt, timeout, **kwargs)
+
+
+async def agenerate_content(prompt, timeout, **kwargs):
+    return await get_llm_gateway().agenerate(prompt, timeout, **kwargs)
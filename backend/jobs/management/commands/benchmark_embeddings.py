@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand, CommandError
+from jobs.job_vectors import job_to_text
+from jobs.model_registry import EMBEDDING_BACKENDS, load_embedding_model
+from jobs.models import Job
+import numpy as np
+import time
+
+
+class Command(BaseCommand):
+    help = "Compare embedding backends on real job texts: throughput and agreement with the torch baseline"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sample", type=int, default=500, help="Number of random Job texts to embed.")
+        parser.add_argument("--batch-size", type=int, default=64, help="Encode batch size.")
+        parser.add_argument(
+            "--backends",
+            default=",".join(EMBEDDING_BACKENDS),
+            help=f"Comma-separated backends to run ({', '.join(EMBEDDING_BACKENDS)}).",
+        )
+        parser.add_argument("--repeat", type=int, default=3, help="Timed runs per backend; the best one is reported.")
+
+    def handle(self, *args, **options):
+        backends = [b.strip() for b in options["backends"].split(",") if b.strip()]
+        unknown = set(backends) - set(EMBEDDING_BACKENDS)
+        if unknown:
+            raise CommandError(f"Unknown backends: {', '.join(sorted(unknown))}")
+        # Agreement is always measured against torch fp32
+        if "torch" in backends:
+            backends.remove("torch")
+        backends.insert(0, "torch")
+
+        texts = [job_to_text(job) for job in Job.objects.order_by("?")[:options["sample"]]]
+        if not texts:
+            raise CommandError("No jobs in the database to benchmark on.")
+        self.stdout.write(f"📊 Benchmarking {len(backends)} backends on {len(texts)} job texts...")
+
+        baseline = None
+        rows = []
+        for backend in backends:
+            try:
+                model = load_embedding_model(backend)
+            except Exception as e:
+                self.stdout.write(self.style.WARNING(f"⚠️ Skipping {backend}: {e}"))
+                continue
+
+            # Warm-up pass so one-off graph/session setup is not timed
+            model.encode(texts[:options["batch_size"]], batch_size=options["batch_size"], normalize_embeddings=True)
+
+            best = None
+            for _ in range(options["repeat"]):
+                started = time.perf_counter()
+                vectors = model.encode(
+                    texts, batch_size=options["batch_size"], normalize_embeddings=True, show_progress_bar=False
+                )
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+
+            vectors = np.asarray(vectors, dtype=np.float32)
+            if baseline is None:
+                baseline = vectors
+            # Row-wise cosine; both sides are already L2-normalized
+            agreement = np.sum(vectors * baseline, axis=1)
+            rows.append((backend, len(texts) / best, float(agreement.mean()), float(agreement.min())))
+
+        self.stdout.write(f"{'backend':<12} {'sentences/sec':>14} {'mean cos':>10} {'min cos':>10}")
+        for backend, rate, mean_cos, min_cos in rows:
+            self.stdout.write(f"{backend:<12} {rate:>14.1f} {mean_cos:>10.4f} {min_cos:>10.4f}")
+        self.stdout.write(self.style.SUCCESS("✅ Benchmark finished."))
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from jobs.vector_index import (
+    JOB_INDEX_ALIAS,
+    get_current_index_name,
+    index_is_current,
+    index_settings,
+    rebuild_job_index,
+)
+
+
+class Command(BaseCommand):
+    help = "Create or rebuild the job vector index and swap the job_idx alias onto it"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--algorithm", choices=["FLAT", "HNSW", "flat", "hnsw"], help="Vector index algorithm.")
+        parser.add_argument("--m", type=int, help="HNSW: max outgoing edges per node.")
+        parser.add_argument("--ef-construction", type=int, help="HNSW: candidate list size while building.")
+        parser.add_argument("--ef-runtime", type=int, help="HNSW: default candidate list size at query time.")
+        parser.add_argument(
+            "--if-changed",
+            action="store_true",
+            help="Only rebuild when the schema version or index settings differ from the live index.",
+        )
+        parser.add_argument(
+            "--keep-old",
+            action="store_true",
+            help="Keep the previous physical index instead of dropping it after the swap.",
+        )
+        parser.add_argument("--timeout", type=float, help="Seconds to wait for the new index to finish building.")
+
+    def handle(self, *args, **options):
+        config = index_settings(
+            algorithm=options["algorithm"],
+            m=options["m"],
+            ef_construction=options["ef_construction"],
+            ef_runtime=options["ef_runtime"],
+        )
+
+        if options["if_changed"] and index_is_current(config):
+            self.stdout.write(f"✅ {JOB_INDEX_ALIAS} -> {get_current_index_name()} is already up to date.")
+            return
+
+        old_name = get_current_index_name()
+        self.stdout.write(f"🔨 Building new index for {JOB_INDEX_ALIAS} with {config}...")
+        new_name = rebuild_job_index(config, drop_old=not options["keep_old"], timeout=options["timeout"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {JOB_INDEX_ALIAS} now points at {new_name} (previously {old_name or 'none'})."
+        ))
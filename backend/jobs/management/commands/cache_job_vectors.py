@@ -1,46 +1,60 @@
 # jobs/management/commands/cache_job_vectors.py
 
 from django.core.management.base import BaseCommand
-from sentence_transformers import SentenceTransformer
-from jobs.models import Job
-from jobs.redis_client import redis_client
-import numpy as np
-import uuid
-import json
-
-model = SentenceTransformer('all-MiniLM-L6-v2')
-
-
-def float32_to_bytes(vec):
-    return np.array(vec, dtype=np.float32).tobytes()
+from jobs.job_vectors import delete_stale_job_keys, iter_job_chunks, write_job_vectors
+import time
 
 
 class Command(BaseCommand):
-    help = "Embed jobs and store all data in Redis for vector search"
-
-    def handle(self, *args, **kwargs):
-        for job in Job.objects.all():
-            combined_text = f"{job.title} {job.description} {', '.join(job.tags)}"
-            vector = model.encode(combined_text, normalize_embeddings=True)
-
-            redis_key = f"job:{str(job.id)}"
-
-            redis_client.hset(redis_key, mapping={
-                "id": str(job.id),
-                "title": job.title,
-                "company": job.company,
-                "location": job.location,
-                "type": job.type,
-                "posted": str(job.posted),
-                #"match_score": job.match_score,
-                "description": job.description,
-                "tags": json.dumps(job.tags),
-                "salary": job.salary,
-                "benefits": json.dumps(job.benefits),
-                #"matched_skills": json.dumps(job.matched_skills),
-                #"missing_skills": json.dumps(job.missing_skills),
-                #"explanation": job.explanation,
-                "embedding": float32_to_bytes(vector)
-            })
-
-        self.stdout.write(self.style.SUCCESS("✅ All job vectors and data stored in Redis."))
+    help = "Embed jobs and store all data in Redis for vector search (full pass; run_vector_indexer keeps it in sync afterwards)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=64,
+            help="Number of texts the embedding model encodes per forward pass.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of jobs read from the database and written to Redis per chunk.",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Re-embed every job, ignoring stored content hashes.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        chunk_size = options["chunk_size"]
+        full = options["full"]
+
+        started = time.perf_counter()
+        total = 0
+        embedded = 0
+        live_ids = set()
+
+        for jobs in iter_job_chunks(chunk_size):
+            total += len(jobs)
+            live_ids.update(str(job.id) for job in jobs)
+
+            # Only new or changed jobs (or ones embedded by another model or
+            # written in an older field layout) are re-encoded
+            written = write_job_vectors(jobs, batch_size=batch_size, full=full)
+            if not written:
+                continue
+
+            embedded += written
+            self.stdout.write(f"📦 Embedded {embedded} of {total} jobs checked so far...")
+
+        deleted = delete_stale_job_keys(live_ids)
+
+        elapsed = time.perf_counter() - started
+        rate = embedded / elapsed if elapsed > 0 else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Checked {total} jobs: {embedded} embedded, {total - embedded} not re-embedded, "
+            f"{deleted} stale jobs removed in {elapsed:.1f}s ({rate:.1f} jobs/sec)."
+        ))
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from jobs.chat_cache import chat_cache_stats, reset_chat_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Report the hit rate and size of the semantic chat cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Clear the counters after reporting.")
+
+    def handle(self, *args, **options):
+        stats = chat_cache_stats()
+        lookups = stats["hits"] + stats["misses"]
+
+        self.stdout.write(f"🔎 Lookups: {lookups} ({stats['hits']} hits, {stats['misses']} misses)")
+        self.stdout.write(f"🎯 Hit rate: {stats['hit_rate']:.1%} at similarity >= {settings.CHAT_CACHE_SIMILARITY_THRESHOLD}")
+        self.stdout.write(f"📦 Entries: {stats['entries']} of {settings.CHAT_CACHE_MAX_ENTRIES} "
+                          f"({stats['stores']} stored, {stats['evictions']} evicted)")
+
+        if options["reset"]:
+            reset_chat_cache_stats()
+            self.stdout.write("🧹 Counters reset.")
+
+        self.stdout.write(self.style.SUCCESS("✅ Chat cache report complete."))
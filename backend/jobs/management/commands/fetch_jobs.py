@@ -1,96 +1,140 @@
-from django.core.management.base import BaseCommand
-from jobs.models import UserProfile, Job
-# from jobs.ai_utils import enrich_job_with_ai  #  Commented: no AI enrichment now call from redis in ai_utils.py
-import requests
-from uuid import uuid4
-from django.utils import timezone
-from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from jobs.models import Job
+from jobs.ingestion import save_job_chunk
+from jobs.redis_client import redis_client
+from jobs.sources import SOURCES, build_session
+from jobs.vector_index import JOB_INDEX_ALIAS
+from redis.commands.search.query import Query
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import threading
 import time
-import json
+
+# Markers a source's producer thread puts on the queue after its last chunk
+DONE = "done"
+FAILED = "failed"
+
 
 class Command(BaseCommand):
-    help = 'Fetch jobs for all users (AI enrichment disabled)'
+    help = 'Fetch jobs from every configured source and upsert them in bulk (AI enrichment disabled)'
 
-    def handle(self, *args, **kwargs):
-        for user in UserProfile.objects.all():
-            print(f"🔍 Fetching jobs for user: {user.name} ({user.email}) — ID: {user.id}")
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sources",
+            default=",".join(SOURCES),
+            help=f"Comma-separated sources to fetch ({', '.join(SOURCES)}).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Jobs written per bulk upsert / transaction; progress is checkpointed after each.",
+        )
+        parser.add_argument(
+            "--near-duplicate-threshold",
+            type=float,
+            default=None,
+            help="Also skip new jobs whose embedding is at least this cosine-similar to an indexed job (e.g. 0.97).",
+        )
 
-            jobs = self.fetch_jobs_from_api(user)
-            for job_data in jobs:
-                #time.sleep(4)   reduce delay since no AI call
+    def handle(self, *args, **options):
+        names = [name.strip() for name in options["sources"].split(",") if name.strip()]
+        if not names:
+            raise CommandError(f"No sources given; choose from {', '.join(SOURCES)}.")
+        unknown = set(names) - set(SOURCES)
+        if unknown:
+            raise CommandError(f"Unknown sources: {', '.join(sorted(unknown))}")
 
-                # 🔻 Commented out enrichment
-                # enriched = enrich_job_with_ai(user, job_data)
-                # if not enriched:
-                #     print(f"⚠️ Skipping job due to failed enrichment: {job_data.get('title', 'Unknown')}")
-                #     continue
+        threshold = options["near_duplicate_threshold"]
+        chunk_size = options["chunk_size"]
+        near_duplicate = (lambda row: self.find_near_duplicate(row, threshold)) if threshold is not None else None
 
-                required_fields = ['title', 'company', 'location', 'type', 'posted', 'description']
-                if not all(field in job_data and job_data[field] for field in required_fields):
-                    print(f"⚠️ Skipping job due to missing required fields: {job_data.get('title', 'Unknown')}")
-                    continue
+        session = build_session()
+        sources = [SOURCES[name](session=session) for name in names]
 
-                job_id = str(uuid4())  # Always assign a new UUID
+        # Sources download and parse concurrently; all database writes stay on
+        # this thread. The bounded queue keeps a fast source from buffering its
+        # whole feed ahead of the writer.
+        chunks = queue.Queue(maxsize=len(sources) * 2)
+        # Set when the writer stops early (an error outside a chunk save,
+        # Ctrl-C), so producers blocked on the full queue give up instead of
+        # keeping the pool from shutting down
+        stop = threading.Event()
 
+        def put(item):
+            while not stop.is_set():
                 try:
-                    job_obj, created = Job.objects.update_or_create(
-                        id=job_id,
-                        defaults=job_data  # 🔁 Use job_data directly
-                    )
-                    if created:
-                        print(f"✅ Saved: {job_data['title']} — {job_data['company']}")
-                    else:
-                        print(f"🔁 Skipped (already saved): {job_data['title']} — {job_data['company']}")
-                except Exception as e:
-                    print(f"❌ Failed to save job {job_data.get('title', 'Unknown')}: {e}")
-
-    def fetch_jobs_from_api(self, user):
-        try:
-            response = requests.get("https://remoteok.com/api")
-            response.raise_for_status()
-            data = response.json()
-            jobs = []
-
-            for job in data:
-                if isinstance(job, dict) and 'tags' in job:
-                    # Handle date conversion properly
-                    date_str = job.get("date")
+                    chunks.put(item, timeout=1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce(source):
+            try:
+                for offset, jobs in source.iter_chunks(chunk_size):
+                    if not put((source, offset, jobs)):
+                        return
+                put((source, DONE, None))
+            except Exception as e:
+                put((source, FAILED, e))
+
+        started = time.perf_counter()
+        totals = {"inserted": 0, "updated": 0, "skipped": 0}
+
+        failed = set()
+
+        with ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="ingest") as pool:
+            for source in sources:
+                pool.submit(produce, source)
+
+            try:
+                remaining = len(sources)
+                while remaining:
+                    source, offset, payload = chunks.get()
+                    if offset == DONE:
+                        remaining -= 1
+                        if source not in failed:
+                            source.complete()
+                            print(f"✅ {source.name}: finished")
+                        continue
+                    if offset == FAILED:
+                        remaining -= 1
+                        print(f"❌ Failed to fetch jobs from {source.name}: {payload}")
+                        continue
+                    if source in failed:
+                        # Drain the rest; the next run resumes from the last checkpoint
+                        continue
+
                     try:
-                        posted_date = datetime.strptime(date_str, "%Y-%m-%d").date() if date_str else timezone.now().date()
-                    except (ValueError, TypeError):
-                        posted_date = timezone.now().date()
-
-                    # Convert tags to JSON-serializable list
-                    tags = job.get("tags", [])
-                    if isinstance(tags, str):
-                        try:
-                            tags = json.loads(tags)
-                        except json.JSONDecodeError:
-                            tags = [tags]
-                    
-                    # Convert benefits to JSON-serializable list
-                    benefits = job.get("benefits", [])
-                    if isinstance(benefits, str):
-                        try:
-                            benefits = json.loads(benefits)
-                        except json.JSONDecodeError:
-                            benefits = [benefits]
-
-                    # Ensure salary is a string
-                    salary = str(job.get("salary", "Not specified"))
-
-                    jobs.append({
-                        "title": str(job.get("position", "")),
-                        "company": str(job.get("company", "")),
-                        "location": str(job.get("location", "Remote")),
-                        "type": str(job.get("type", "Full-time")),
-                        "posted": posted_date,
-                        "description": str(job.get("description", "")),
-                        "tags": tags,
-                        "salary": salary,
-                        "benefits": benefits,
-                    })
-            return jobs
-        except Exception as e:
-            print("❌ Failed to fetch jobs:", e)
-            return []
+                        counts = save_job_chunk(payload, near_duplicate)
+                    except Exception as e:
+                        failed.add(source)
+                        print(f"❌ {source.name}: failed to save jobs up to item {offset}, will resume from here: {e}")
+                        continue
+                    source.checkpoint(offset)
+                    for key, value in counts.items():
+                        totals[key] += value
+                    print(f"📦 {source.name}: {offset} items processed")
+            finally:
+                stop.set()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Ingested jobs in {elapsed:.1f}s: {totals['inserted']} inserted, "
+            f"{totals['updated']} updated, {totals['skipped']} skipped."
+        ))
+
+    def find_near_duplicate(self, job_data, threshold):
+        # Nearest indexed job by embedding; catches reworded copies the
+        # exact fingerprint misses
+        from jobs.job_vectors import job_to_text
+        from jobs.vector_codec import vector_to_bytes
+        from jobs.model_registry import get_embedding_model
+
+        vector = get_embedding_model().encode(job_to_text(Job(**job_data)), normalize_embeddings=True)
+        q = Query("*=>[KNN 1 @embedding $vec AS score]").return_fields("score").dialect(2)
+        results = redis_client.ft(JOB_INDEX_ALIAS).search(q, query_params={"vec": vector_to_bytes(vector)})
+        if results.docs and 1.0 - float(results.docs[0].score) >= threshold:
+            return results.docs[0].id
+        return None
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from jobs.job_vectors import job_to_text
+from jobs.model_registry import get_embedding_model
+from jobs.models import Job
+from jobs.vector_codec import save_pca
+import numpy as np
+
+
+class Command(BaseCommand):
+    help = "Fit the PCA projection used to store reduced job vectors (VECTOR_PCA_DIM)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sample", type=int, default=20000, help="Number of random jobs to fit on.")
+        parser.add_argument("--batch-size", type=int, default=64, help="Encode batch size.")
+
+    def handle(self, *args, **options):
+        from sklearn.decomposition import PCA
+
+        dim = settings.VECTOR_PCA_DIM
+        if not dim:
+            raise CommandError("Set VECTOR_PCA_DIM to the target dimension first.")
+
+        texts = [job_to_text(job) for job in Job.objects.order_by("?")[:options["sample"]]]
+        if len(texts) < dim:
+            raise CommandError(f"Need at least {dim} jobs to fit {dim} components, found {len(texts)}.")
+
+        self.stdout.write(f"📐 Fitting {dim}-d PCA on {len(texts)} job embeddings...")
+        vectors = get_embedding_model().encode(
+            texts, batch_size=options["batch_size"], normalize_embeddings=True, show_progress_bar=False
+        )
+        pca = PCA(n_components=dim).fit(np.asarray(vectors, dtype=np.float32))
+        fitted_at = save_pca(pca.mean_, pca.components_)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Stored projection {fitted_at} ({pca.explained_variance_ratio_.sum():.1%} variance kept). "
+            "Now run build_job_index and cache_job_vectors, then restart the web and worker processes."
+        ))
@@ -0,0 +1,124 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from jobs.ai_utils import active_user_ids, precomputed_feed_key, store_precomputed_feeds, user_profile_hash, user_profile_text
+from jobs.job_vectors import JOB_CORPUS_VERSION_KEY, corpus_version, load_job_matrix
+from jobs.model_registry import get_embedding_model
+from jobs.models import UserProfile
+from jobs.redis_client import redis_client
+from jobs.vector_codec import to_storage_space
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import json
+import os
+import time
+
+# Set once per worker process by the pool initializer, so the job matrix is
+# shipped to each worker once instead of with every chunk
+_job_ids = None
+_job_matrix = None
+
+
+def _init_worker(job_ids, job_matrix):
+    global _job_ids, _job_matrix
+    _job_ids = job_ids
+    _job_matrix = job_matrix
+
+
+def rank_profiles(profile_hashes, profile_vectors, top_n):
+    # Exact cosine ranking of every job for a chunk of profiles: one matrix
+    # multiplication, then a partial sort per row. Distances match the
+    # COSINE distance the KNN query returns.
+    scores = profile_vectors @ _job_matrix.T
+    n = min(top_n, scores.shape[1])
+    top = np.argpartition(-scores, n - 1, axis=1)[:, :n]
+    feeds = []
+    for profile_hash, row, candidates in zip(profile_hashes, scores, top):
+        ordered = candidates[np.argsort(-row[candidates])]
+        feeds.append((profile_hash, [[_job_ids[i], float(1.0 - row[i])] for i in ordered]))
+    return feeds
+
+
+class Command(BaseCommand):
+    help = "Precompute each active user's ranked job feed against the whole job corpus"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--active-days", type=int, default=30, help="Only users who requested a feed in this many days.")
+        parser.add_argument("--all", action="store_true", help="Precompute for every user profile.")
+        parser.add_argument("--top-n", type=int, default=None, help="Jobs kept per feed (default FEED_CANDIDATE_POOL).")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes used for ranking.")
+        parser.add_argument("--chunk-size", type=int, default=256, help="Profiles ranked per task.")
+        parser.add_argument("--batch-size", type=int, default=64, help="Profile texts encoded per forward pass.")
+        parser.add_argument("--force", action="store_true", help="Recompute feeds that are still current.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        top_n = options["top_n"] or settings.FEED_CANDIDATE_POOL
+
+        if options["all"]:
+            user_batches = [UserProfile.objects.all()]
+        else:
+            since = time.time() - options["active_days"] * 86400
+            user_ids = active_user_ids(since)
+            user_batches = [UserProfile.objects.filter(id__in=user_ids[i:i + 1000]) for i in range(0, len(user_ids), 1000)]
+
+        # Users with the same profile share a feed
+        profiles = {}
+        for users in user_batches:
+            for user in users.iterator():
+                profiles.setdefault(user_profile_hash(user), user_profile_text(user))
+
+        # Read the version before the vectors, so a change while this runs
+        # leaves the stored feeds stale rather than wrongly current
+        version = corpus_version()
+        if not options["force"] and profiles:
+            hashes = list(profiles)
+            stored = redis_client.mget([precomputed_feed_key(profile_hash) for profile_hash in hashes])
+            for profile_hash, value in zip(hashes, stored):
+                if value and json.loads(value)["corpus_version"] == version:
+                    del profiles[profile_hash]
+
+        if not profiles:
+            self.stdout.write(self.style.SUCCESS("✅ Every feed is already current."))
+            return
+
+        job_ids, job_matrix = load_job_matrix()
+        if not job_ids:
+            self.stdout.write(self.style.WARNING("⚠️ No job vectors in Redis; run cache_job_vectors first."))
+            return
+        self.stdout.write(f"📦 Ranking {len(job_ids)} jobs for {len(profiles)} profiles...")
+
+        # One batched encode for every profile, projected into the stored format
+        hashes = list(profiles)
+        vectors = get_embedding_model().encode(
+            [profiles[profile_hash] for profile_hash in hashes],
+            batch_size=options["batch_size"],
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+        vectors = to_storage_space(vectors).astype(np.float32)
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+        chunk_size = options["chunk_size"]
+        chunks = [
+            (hashes[i:i + chunk_size], vectors[i:i + chunk_size])
+            for i in range(0, len(hashes), chunk_size)
+        ]
+        workers = max(1, min(options["workers"], len(chunks)))
+
+        written = 0
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(job_ids, job_matrix)) as pool:
+            futures = [pool.submit(rank_profiles, chunk_hashes, chunk_vectors, top_n) for chunk_hashes, chunk_vectors in chunks]
+            for future in futures:
+                feeds = future.result()
+                store_precomputed_feeds(feeds, version)
+                written += len(feeds)
+                self.stdout.write(f"📦 Stored {written} of {len(hashes)} feeds...")
+
+        changed = corpus_version() - version
+        if changed > settings.FEED_PRECOMPUTED_MAX_STALE_JOBS:
+            self.stdout.write(self.style.WARNING(
+                f"⚠️ {changed} job vectors changed while ranking ({JOB_CORPUS_VERSION_KEY}); these feeds will be recomputed on demand."
+            ))
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"✅ Precomputed {written} feeds in {elapsed:.1f}s."))
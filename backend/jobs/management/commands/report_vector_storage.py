@@ -0,0 +1,114 @@
+from django.core.management.base import BaseCommand, CommandError
+from jobs.job_vectors import JOB_DOC_PREFIX, job_to_text
+from jobs.model_registry import get_embedding_model
+from jobs.models import Job, UserProfile
+from jobs.redis_client import redis_client
+from jobs.vector_codec import VECTOR_DTYPES, reduce_vectors, vector_format
+from jobs.vector_index import EMBEDDING_DIM, JOB_INDEX_ALIAS, JOB_KEY_PREFIX, get_index_info
+import numpy as np
+
+
+def top_k(queries, corpus, k):
+    scores = queries @ corpus.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def normalize(vectors):
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+class Command(BaseCommand):
+    help = "Report Redis memory per job and recall@k of compact vector formats against the float32 baseline"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sample", type=int, default=5000, help="Number of random jobs used as the search corpus.")
+        parser.add_argument("--queries", type=int, default=200, help="Number of user profiles (or job titles) to query with.")
+        parser.add_argument("--k", type=int, default=10, help="Cut-off for recall@k.")
+        parser.add_argument(
+            "--formats",
+            default="FLOAT32,FLOAT16,FLOAT16:128,FLOAT16:64",
+            help="Comma-separated TYPE[:DIM] formats to compare; DIM below 384 fits PCA on the sample.",
+        )
+        parser.add_argument("--batch-size", type=int, default=64, help="Encode batch size.")
+
+    def handle(self, *args, **options):
+        self.report_redis_memory(options["sample"])
+        self.report_recall(options)
+
+    def report_redis_memory(self, sample):
+        # What the stored jobs cost right now, in whatever format they were written
+        keys = []
+        for key in redis_client.scan_iter(match=f"{JOB_KEY_PREFIX}*", count=1000):
+            keys.append(key)
+            if len(keys) >= sample:
+                break
+        if not keys:
+            self.stdout.write("ℹ️ No job vectors in Redis yet; skipping the memory report.")
+            return
+
+        pipe = redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.memory_usage(key)
+            pipe.memory_usage(JOB_DOC_PREFIX + key[len(JOB_KEY_PREFIX):])
+        usage = pipe.execute()
+        hash_bytes = np.mean([value or 0 for value in usage[0::2]])
+        doc_bytes = np.mean([value or 0 for value in usage[1::2]])
+
+        info = get_index_info(JOB_INDEX_ALIAS) or {}
+        num_docs = int(info.get("num_docs", 0) or 0)
+        index_bytes = float(info.get("vector_index_sz_mb", 0) or 0) * 1024 * 1024 / num_docs if num_docs else 0.0
+
+        self.stdout.write(f"💾 Stored format {vector_format()}, measured on {len(keys)} jobs:")
+        self.stdout.write(f"   job:<id> hash     {hash_bytes:>10.0f} bytes/job")
+        self.stdout.write(f"   jobdoc:<id> hash  {doc_bytes:>10.0f} bytes/job")
+        self.stdout.write(f"   vector index      {index_bytes:>10.0f} bytes/job")
+
+    def report_recall(self, options):
+        from sklearn.decomposition import PCA
+
+        jobs = list(Job.objects.order_by("?")[:options["sample"]])
+        if len(jobs) <= options["k"]:
+            raise CommandError("Not enough jobs in the database to measure recall.")
+
+        queries = [
+            f"{profile.role} {', '.join(profile.skills)} {profile.experience}"
+            for profile in UserProfile.objects.order_by("?")[:options["queries"]]
+        ]
+        if not queries:
+            # No users yet: job titles make reasonable short queries
+            queries = [job.title for job in jobs[:options["queries"]]]
+
+        model = get_embedding_model()
+        encode = lambda texts: np.asarray(model.encode(
+            texts, batch_size=options["batch_size"], normalize_embeddings=True, show_progress_bar=False
+        ), dtype=np.float32)
+        corpus = encode([job_to_text(job) for job in jobs])
+        query_vectors = encode(queries)
+
+        k = options["k"]
+        baseline = top_k(query_vectors, corpus, k)
+
+        self.stdout.write(f"🎯 recall@{k} vs FLOAT32:{EMBEDDING_DIM} over {len(jobs)} jobs and {len(queries)} queries:")
+        self.stdout.write(f"{'format':<14} {'bytes/vector':>13} {'recall@' + str(k):>10}")
+        for name in [value.strip().upper() for value in options["formats"].split(",") if value.strip()]:
+            vector_type, _, dim = name.partition(":")
+            dim = int(dim or EMBEDDING_DIM)
+            if vector_type not in VECTOR_DTYPES:
+                raise CommandError(f"Unknown vector type in {name}")
+
+            stored, probes = corpus, query_vectors
+            if dim < EMBEDDING_DIM:
+                pca = PCA(n_components=dim).fit(corpus)
+                stored = reduce_vectors(corpus, pca.mean_, pca.components_)
+                probes = reduce_vectors(query_vectors, pca.mean_, pca.components_)
+
+            # Round-trip through the storage type, as Redis would hold it
+            dtype = VECTOR_DTYPES[vector_type]
+            stored = normalize(stored.astype(dtype).astype(np.float32))
+            probes = normalize(probes.astype(dtype).astype(np.float32))
+
+            found = top_k(probes, stored, k)
+            recall = np.mean([len(set(a) & set(b)) / k for a, b in zip(baseline, found)])
+            self.stdout.write(f"{name:<14} {dim * np.dtype(dtype).itemsize:>13} {recall:>10.3f}")
+
+        self.stdout.write(self.style.SUCCESS("✅ Report finished."))
@@ -0,0 +1,87 @@
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from jobs.ai_utils import enrichment_cache_key, fetch_jobs_from_index, match_profile_fingerprint, score_jobs, store_enriched_jobs
+from jobs.enrichment_queue import acknowledge, ensure_consumer_group, read_enrichment_batch
+from jobs.models import UserProfile
+from collections import defaultdict
+import logging
+import socket
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Consume queued job enrichments from Redis and fill the semantic cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--consumer", default=f"{socket.gethostname()}-{os.getpid()}", help="Consumer name in the group.")
+        parser.add_argument("--count", type=int, default=20, help="Max queue entries handled per iteration.")
+        parser.add_argument("--block-ms", type=int, default=5000, help="How long to block waiting for new entries.")
+        parser.add_argument(
+            "--min-idle-ms",
+            type=int,
+            default=60000,
+            help="Reclaim entries left unacknowledged by another consumer for this long.",
+        )
+        parser.add_argument("--once", action="store_true", help="Process a single batch and exit.")
+
+    def handle(self, *args, **options):
+        ensure_consumer_group()
+        self.stdout.write(f"👷 Enrichment worker {options['consumer']} started.")
+
+        while True:
+            # Drop connections the database closed while we were blocked on Redis
+            close_old_connections()
+            entries = read_enrichment_batch(
+                options["consumer"], options["count"], options["block_ms"], options["min_idle_ms"]
+            )
+            if entries:
+                try:
+                    self.process(entries)
+                except Exception:
+                    # Unacknowledged entries are reclaimed after --min-idle-ms
+                    logger.exception("Enrichment batch failed")
+            if options["once"]:
+                break
+
+    def process(self, entries):
+        by_user = defaultdict(list)
+        for entry_id, fields in entries:
+            by_user[fields["user_id"]].append((entry_id, fields))
+
+        for user_id, user_entries in by_user.items():
+            try:
+                user = UserProfile.objects.get(id=user_id)
+            except UserProfile.DoesNotExist:
+                logger.warning(f"Dropping {len(user_entries)} queued enrichments for missing user {user_id}")
+                acknowledge(user_entries)
+                continue
+
+            # Jobs are scored against the profile as it is now; entries queued
+            # under an older profile would store that result under the old
+            # profile's key, so they are acknowledged without storing
+            fingerprint = match_profile_fingerprint(user)
+            current = [
+                (entry_id, fields) for entry_id, fields in user_entries
+                if fields["cache_key"] == enrichment_cache_key(fingerprint, fields["job_id"])
+            ]
+            if len(current) < len(user_entries):
+                logger.info(f"Skipping {len(user_entries) - len(current)} enrichments queued before {user.email}'s profile changed")
+
+            stored = fetch_jobs_from_index([fields["job_id"] for _, fields in current])
+
+            jobs, cache_keys, distances = [], [], []
+            for (_, fields), job in zip(current, stored):
+                if job is None:
+                    # Job left the index since it was queued
+                    continue
+                jobs.append(job)
+                cache_keys.append(fields["cache_key"])
+                # Entries queued before distances were recorded score on skills alone
+                distances.append(float(fields["distance"]) if "distance" in fields else None)
+
+            store_enriched_jobs(user, list(zip(cache_keys, score_jobs(user, jobs, distances))))
+
+            acknowledge(user_entries)
+            self.stdout.write(f"✅ Enriched {len(jobs)} jobs for {user.email}")
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from jobs.index_sync import sync_job_index_batch
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Keep the Redis vector index in sync with the Job table by draining the index outbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100, help="Max queued jobs handled per micro-batch.")
+        parser.add_argument("--embed-batch-size", type=int, default=64, help="Texts encoded per forward pass.")
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait before checking an empty queue again.",
+        )
+        parser.add_argument("--once", action="store_true", help="Drain the queue once and exit.")
+
+    def handle(self, *args, **options):
+        self.stdout.write("👷 Vector indexer started.")
+
+        while True:
+            close_old_connections()
+            try:
+                indexed, embedded, deleted = sync_job_index_batch(options["batch_size"], options["embed_batch_size"])
+            except Exception:
+                # Entries stay queued and are retried on the next pass
+                logger.exception("Vector index sync failed")
+                indexed = embedded = deleted = 0
+                time.sleep(options["poll_interval"])
+
+            if indexed or deleted:
+                self.stdout.write(
+                    f"✅ Synced {indexed} jobs ({embedded} re-embedded), removed {deleted} from the index"
+                )
+                # Keep going while there is a backlog
+                continue
+
+            if options["once"]:
+                break
+            time.sleep(options["poll_interval"])
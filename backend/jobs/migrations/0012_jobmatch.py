@@ -0,0 +1,47 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0011_alter_job_explanation_alter_job_match_score_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='job',
+            name='explanation',
+        ),
+        migrations.RemoveField(
+            model_name='job',
+            name='match_score',
+        ),
+        migrations.RemoveField(
+            model_name='job',
+            name='matched_skills',
+        ),
+        migrations.RemoveField(
+            model_name='job',
+            name='missing_skills',
+        ),
+        migrations.CreateModel(
+            name='JobMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('profile_hash', models.CharField(max_length=32)),
+                ('match_score', models.IntegerField(default=0)),
+                ('matched_skills', models.JSONField(default=list)),
+                ('missing_skills', models.JSONField(default=list)),
+                ('explanation', models.TextField(blank=True, default='')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='jobs.job')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_matches', to='jobs.userprofile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'job'), name='unique_job_match_per_user')],
+            },
+        ),
+    ]
@@ -0,0 +1,70 @@
+import hashlib
+import re
+
+from django.db import migrations, models
+
+
+def _fingerprint(title, company, location):
+    # Frozen copy of jobs.models.job_fingerprint
+    parts = [re.sub(r"\s+", " ", re.sub(r"[^\w\s]", " ", (value or "").lower())).strip()
+             for value in (title, company, location)]
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+
+def remove_cached_vectors(job_ids):
+    # Deleted rows still have job:<id> / jobdoc:<id> hashes in Redis, which
+    # would keep showing up in vector searches. Best effort: the migration
+    # must not depend on Redis being up, and `cache_job_vectors` removes
+    # whatever is left behind.
+    from jobs.redis_client import redis_client
+
+    try:
+        for start in range(0, len(job_ids), 500):
+            batch = job_ids[start:start + 500]
+            redis_client.delete(*[f"job:{job_id}" for job_id in batch], *[f"jobdoc:{job_id}" for job_id in batch])
+    except Exception as e:
+        print(f"\n⚠️ Could not remove cached vectors of {len(job_ids)} duplicate jobs ({e}); "
+              f"run `python manage.py cache_job_vectors` to clean them up.")
+
+
+def fill_fingerprints(apps, schema_editor):
+    # Every fetch_jobs run used to insert the whole feed again under fresh
+    # UUIDs; keep one row per posting (preferring one with an external id,
+    # then the most recent) before the column becomes unique.
+    Job = apps.get_model('jobs', 'Job')
+    kept = {}
+    duplicates = []
+    for job in Job.objects.order_by(models.F('external_id').desc(nulls_last=True), '-posted').iterator():
+        fingerprint = _fingerprint(job.title, job.company, job.location)
+        if fingerprint in kept:
+            duplicates.append(job.pk)
+            continue
+        kept[fingerprint] = job.pk
+        job.fingerprint = fingerprint
+        job.save(update_fields=['fingerprint'])
+
+    for start in range(0, len(duplicates), 500):
+        Job.objects.filter(pk__in=duplicates[start:start + 500]).delete()
+    if duplicates:
+        remove_cached_vectors([str(pk) for pk in duplicates])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0012_jobmatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=40, null=True),
+        ),
+        migrations.RunPython(fill_fingerprints, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='job',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=40, null=True, unique=True),
+        ),
+    ]
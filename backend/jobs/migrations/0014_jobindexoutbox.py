@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0013_job_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobIndexOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.UUIDField(unique=True)),
+                ('deleted', models.BooleanField(default=False)),
+                ('queued_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,80 @@
+from django.conf import settings
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+GEMINI_MODEL_NAME = "gemini-2.0-flash"
+
+# CPU inference backends for the embedding model, picked by settings.EMBEDDING_BACKEND:
+#   torch       - PyTorch fp32 (baseline)
+#   torch-int8  - PyTorch with dynamic int8 quantization of the Linear layers
+#   onnx        - ONNX Runtime fp32 (needs `sentence-transformers[onnx]`)
+#   onnx-int8   - ONNX Runtime with a pre-quantized int8 export of the model
+EMBEDDING_BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+
+# Heavy clients are built on first use and shared by every caller in the
+# process, so commands that never embed or call Gemini (migrate, fetch_jobs,
+# ...) don't pay for torch or the model download.
+_embedding_lock = threading.Lock()
+_gemini_lock = threading.Lock()
+_embedding_model = None
+_gemini_model = None
+
+
+def embedding_model_id(backend=None):
+    # Stored next to each job vector; vectors from different backends differ
+    # slightly, so switching backend re-embeds the catalog
+    backend = backend or settings.EMBEDDING_BACKEND
+    return EMBEDDING_MODEL_NAME if backend == "torch" else f"{EMBEDDING_MODEL_NAME}@{backend}"
+
+
+def load_embedding_model(backend):
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(EMBEDDING_MODEL_NAME, device="cpu")
+    if backend == "torch-int8":
+        import torch
+
+        model = SentenceTransformer(EMBEDDING_MODEL_NAME, device="cpu")
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    if backend == "onnx":
+        return SentenceTransformer(EMBEDDING_MODEL_NAME, device="cpu", backend="onnx")
+    if backend == "onnx-int8":
+        return SentenceTransformer(
+            EMBEDDING_MODEL_NAME,
+            device="cpu",
+            backend="onnx",
+            model_kwargs={"file_name": settings.EMBEDDING_ONNX_QUANTIZED_FILE},
+        )
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+
+def get_embedding_model():
+    global _embedding_model
+    if _embedding_model is None:
+        with _embedding_lock:
+            if _embedding_model is None:
+                logger.info(f"Loading embedding model {embedding_model_id()}")
+                _embedding_model = load_embedding_model(settings.EMBEDDING_BACKEND)
+    return _embedding_model
+
+
+def get_gemini_model():
+    global _gemini_model
+    if _gemini_model is None:
+        with _gemini_lock:
+            if _gemini_model is None:
+                import google.generativeai as genai
+                genai.configure(api_key=settings.GOOGLE_API_KEY)
+                _gemini_model = genai.GenerativeModel(GEMINI_MODEL_NAME)
+    return _gemini_model
+
+
+def warm_up():
+    # Load everything up front (e.g. at worker start) so the first request
+    # doesn't pay the load cost
+    get_embedding_model().encode("warm up", normalize_embeddings=True)
+    get_gemini_model()
@@ -1,6 +1,16 @@
+import hashlib
+import re
 import uuid
 from django.db import models
 
+
+def job_fingerprint(title, company, location):
+    # Normalized title + company + location, used to spot the same posting
+    # arriving under a different id
+    parts = [re.sub(r"\s+", " ", re.sub(r"[^\w\s]", " ", (value or "").lower())).strip()
+             for value in (title, company, location)]
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
 class UserProfile(models.Model):
     id = models.CharField(primary_key=True, max_length=100)  # Auth0 ID
     name = models.CharField(max_length=100)
@@ -17,19 +27,52 @@ class UserProfile(models.Model):
 class Job(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     external_id = models.CharField(max_length=100, null=True, blank=True, unique=True)
+    fingerprint = models.CharField(max_length=40, null=True, blank=True, unique=True, editable=False)
     title = models.CharField(max_length=255)
     company = models.CharField(max_length=255)
     location = models.CharField(max_length=100)
     type = models.CharField(max_length=50)
     posted = models.DateField()
-    match_score = models.IntegerField(null=True, blank=True)
     description = models.TextField()
     tags = models.JSONField(default=list)
     salary = models.CharField(max_length=50)
     benefits = models.JSONField(default=list)
-    matched_skills = models.JSONField(null=True, blank=True, default=list)
-    missing_skills = models.JSONField(null=True, blank=True, default=list)
-    explanation = models.TextField(null=True, blank=True)
+
+    def save(self, *args, **kwargs):
+        self.fingerprint = job_fingerprint(self.title, self.company, self.location)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.title} at {self.company}"
+
+
+class JobMatch(models.Model):
+    # Per-user AI match result, kept off Job so users don't overwrite each other
+    user = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name="job_matches")
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="matches")
+    profile_hash = models.CharField(max_length=32)
+    match_score = models.IntegerField(default=0)
+    matched_skills = models.JSONField(default=list)
+    missing_skills = models.JSONField(default=list)
+    explanation = models.TextField(blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "job"], name="unique_job_match_per_user"),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.job} ({self.match_score})"
+
+
+class JobIndexOutbox(models.Model):
+    # Jobs whose job:<id> vector hash needs rewriting (or removing), written in
+    # the same transaction as the change and drained by run_vector_indexer.
+    # One row per job: re-queueing a job just moves its queued_at forward.
+    job_id = models.UUIDField(unique=True)
+    deleted = models.BooleanField(default=False)
+    queued_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{'delete' if self.deleted else 'index'} {self.job_id}"
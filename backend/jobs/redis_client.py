@@ -1,5 +1,8 @@
 from django.conf import settings
+import asyncio
 import redis
+import redis.asyncio
+import weakref
 
 redis_client = redis.Redis(
     host=settings.REDIS_HOST,
@@ -8,3 +11,27 @@ redis_client = redis.Redis(
     decode_responses=True
 )
 
+# Same server, but returns raw bytes for values that are not UTF-8 text (vectors)
+redis_binary_client = redis.Redis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    db=0,
+    decode_responses=False
+)
+
+# redis.asyncio connections belong to the event loop that opened them, so the
+# async views get one client per running loop (one under ASGI; one per request
+# when async views run under WSGI)
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_redis_client(binary=False):
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    if binary not in clients:
+        clients[binary] = redis.asyncio.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=0,
+            decode_responses=not binary,
+        )
+    return clients[binary]
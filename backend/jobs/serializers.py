@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import UserProfile, Job
+from .models import UserProfile, Job, JobMatch
 
 class UserProfileSerializer(serializers.ModelSerializer):
     class Meta:
@@ -10,3 +10,8 @@ class JobSerializer(serializers.ModelSerializer):
     class Meta:
         model = Job
         fields = '__all__'
+
+class JobMatchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = JobMatch
+        fields = ['match_score', 'matched_skills', 'missing_skills', 'explanation']
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .index_sync import queue_job_index_updates
+from .models import Job
+
+
+# Single-row saves and deletes (admin, API, shell). Bulk ingestion bypasses
+# signals and queues its rows explicitly in save_job_chunk.
+@receiver(post_save, sender=Job)
+def queue_saved_job(sender, instance, raw=False, **kwargs):
+    if not raw:
+        queue_job_index_updates([instance.id])
+
+
+@receiver(post_delete, sender=Job)
+def queue_deleted_job(sender, instance, **kwargs):
+    queue_job_index_updates([instance.id], deleted=True)
@@ -0,0 +1,112 @@
+from django.conf import settings
+import re
+
+# Canonical skill name -> spellings seen in profiles and job tags. Anything
+# not listed here is compared on its normalized text alone.
+SKILL_ALIASES = {
+    "javascript": ["js", "ecmascript", "es6", "vanilla js"],
+    "typescript": ["ts"],
+    "python": ["py", "python3"],
+    "node.js": ["node", "nodejs", "node js"],
+    "react": ["reactjs", "react.js", "react js"],
+    "react native": ["react-native", "reactnative"],
+    "vue": ["vuejs", "vue.js", "vue js"],
+    "angular": ["angularjs", "angular.js"],
+    "next.js": ["next", "nextjs"],
+    "express": ["expressjs", "express.js"],
+    "django": ["django rest framework", "drf"],
+    "golang": ["go", "go lang"],
+    "c#": ["csharp", "c sharp", ".net", "dotnet"],
+    "c++": ["cpp", "cplusplus"],
+    "ruby on rails": ["rails", "ror"],
+    "postgresql": ["postgres", "psql"],
+    "mongodb": ["mongo"],
+    "mysql": ["my sql"],
+    "sql": ["sql server", "mssql", "t-sql"],
+    "kubernetes": ["k8s"],
+    "docker": ["containers", "containerization"],
+    "aws": ["amazon web services"],
+    "gcp": ["google cloud", "google cloud platform"],
+    "azure": ["microsoft azure"],
+    "ci/cd": ["cicd", "ci cd", "continuous integration"],
+    "machine learning": ["ml"],
+    "artificial intelligence": ["ai"],
+    "natural language processing": ["nlp"],
+    "deep learning": ["dl"],
+    "user experience": ["ux"],
+    "user interface": ["ui"],
+    "html": ["html5"],
+    "css": ["css3"],
+    "rest api": ["rest", "restful", "restful api", "rest apis"],
+    "graphql": ["graph ql"],
+    "devops": ["dev ops"],
+}
+
+_ALIAS_LOOKUP = {alias: canonical for canonical, aliases in SKILL_ALIASES.items() for alias in aliases}
+
+
+def normalize_skill(skill):
+    # Lowercase, collapse whitespace, drop wrapping punctuation, then map aliases
+    value = re.sub(r"\s+", " ", str(skill or "").strip().lower())
+    value = value.strip(" .,;:()[]'\"")
+    return _ALIAS_LOOKUP.get(value, value)
+
+
+def skill_overlap(user_skills, job_tags):
+    # Matched and missing job skills (in the job's own spelling) plus the
+    # share of the job's skills the user has; None when the job lists none
+    have = {normalize_skill(skill) for skill in user_skills or []} - {""}
+
+    matched, missing, seen = [], [], set()
+    for tag in job_tags or []:
+        key = normalize_skill(tag)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        (matched if key in have else missing).append(str(tag).strip())
+
+    overlap = len(matched) / len(seen) if seen else None
+    return matched, missing, overlap
+
+
+def blended_match_score(distance, overlap):
+    # 0-100 from the KNN cosine distance and the skill overlap; either part
+    # may be missing (job without tags, or no distance for the pair)
+    similarity = None if distance is None else min(1.0, max(0.0, 1.0 - float(distance)))
+    if overlap is None and similarity is None:
+        return 0
+    if overlap is None:
+        score = similarity
+    elif similarity is None:
+        score = overlap
+    else:
+        weight = settings.SKILL_MATCH_WEIGHT
+        score = weight * overlap + (1 - weight) * similarity
+    return int(round(score * 100))
+
+
+def describe_skill_match(matched, missing):
+    if not matched and not missing:
+        return "This job lists no specific skills; the score reflects how closely your profile matches the description."
+    parts = [f"You match {len(matched)} of {len(matched) + len(missing)} listed skills"]
+    if matched:
+        parts[0] += f" ({', '.join(matched)})"
+    if missing:
+        parts.append(f"Skills to develop: {', '.join(missing)}")
+    return ". ".join(parts) + "."
+
+
+def score_job_locally(user_skills, job, distance):
+    # Match fields computed without any AI call
+    matched, missing, overlap = skill_overlap(user_skills, job.get("tags"))
+    return {
+        "match_score": blended_match_score(distance, overlap),
+        "matched_skills": matched,
+        "missing_skills": missing,
+        "explanation": describe_skill_match(matched, missing),
+    }
+
+
+def needs_ai_explanation(scored):
+    # Only promising matches are worth an LLM-written explanation
+    return scored["match_score"] >= settings.AI_EXPLANATION_MIN_SCORE
@@ -0,0 +1,7 @@
+from .base import JobSource, MemoryIngestionState, RedisIngestionState, build_session, iter_json_array
+from .remoteok import RemoteOKSource
+
+# Every ingestion adapter, by name; fetch_jobs runs all of them by default
+SOURCES = {
+    RemoteOKSource.name: RemoteOKSource,
+}
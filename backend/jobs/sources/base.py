@@ -0,0 +1,198 @@
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from ..redis_client import redis_client
+import codecs
+import json
+import logging
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+def build_session(pool_size=None):
+    # One pooled, retrying session shared by every adapter in a run
+    pool_size = pool_size or settings.INGESTION_HTTP_POOL_SIZE
+    retry = Retry(total=3, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504), allowed_methods=("GET",))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = "AI-JobMatcher/1.0 (+job ingestion)"
+    return session
+
+
+def iter_json_array(chunks):
+    # Yields the items of a top-level JSON array from an iterable of text
+    # chunks, without holding the whole document in memory
+    decoder = json.JSONDecoder()
+    buffer = ""
+    started = False
+
+    for chunk in chunks:
+        buffer += chunk
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError("Expected a JSON array")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Item continues in the next chunk
+                break
+            if end == len(buffer) and not isinstance(item, (dict, list, str)):
+                # A bare number may still be cut off
+                break
+            yield item
+            pos = end
+        buffer = buffer[pos:]
+
+    raise ValueError("Truncated JSON array" if started else "Empty response")
+
+
+class RedisIngestionState:
+    # Per-source validators (ETag / Last-Modified) and resume checkpoint,
+    # kept in the ingest:<source> hash
+    def __init__(self, source_name):
+        self.key = f"ingest:{source_name}"
+
+    def load(self):
+        return redis_client.hgetall(self.key)
+
+    def save(self, **fields):
+        fields = {key: value for key, value in fields.items() if value is not None}
+        if fields:
+            redis_client.hset(self.key, mapping=fields)
+
+    def clear(self, *fields):
+        redis_client.hdel(self.key, *fields)
+
+
+class MemoryIngestionState:
+    def __init__(self):
+        self.data = {}
+
+    def load(self):
+        return dict(self.data)
+
+    def save(self, **fields):
+        self.data.update({key: str(value) for key, value in fields.items() if value is not None})
+
+    def clear(self, *fields):
+        for field in fields:
+            self.data.pop(field, None)
+
+
+class JobSource:
+    # Adapter for one external job feed. Subclasses set `name` and `url` and
+    # implement `normalize`, which maps a raw item to the dict shape stored
+    # on Job (or returns None to skip it).
+    name = None
+    url = None
+
+    def __init__(self, session=None, state=None, url=None):
+        self.session = session or build_session()
+        self.state = state or RedisIngestionState(self.name)
+        self.url = url or self.url
+        self.response_validators = {}
+        self.not_modified = False
+
+    def normalize(self, item):
+        raise NotImplementedError
+
+    def external_id(self, raw_id):
+        # Namespaced so ids from different sources never collide
+        return f"{self.name}:{raw_id}" if raw_id not in (None, "") else None
+
+    def open(self, state):
+        headers = {}
+        # A pending checkpoint needs the body again, so skip the conditional GET
+        if "checkpoint_offset" not in state:
+            if state.get("etag"):
+                headers["If-None-Match"] = state["etag"]
+            if state.get("last_modified"):
+                headers["If-Modified-Since"] = state["last_modified"]
+
+        response = self.session.get(
+            self.url,
+            headers=headers,
+            stream=True,
+            timeout=(settings.INGESTION_HTTP_CONNECT_TIMEOUT, settings.INGESTION_HTTP_READ_TIMEOUT),
+        )
+        if response.status_code == 304:
+            response.close()
+            self.not_modified = True
+            return None
+        response.raise_for_status()
+        self.response_validators = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        return response
+
+    def iter_items(self, response):
+        decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+        return iter_json_array(decoder.decode(chunk) for chunk in response.iter_content(chunk_size=64 * 1024))
+
+    def iter_chunks(self, chunk_size):
+        # Yields (offset, jobs) where offset counts the raw feed items consumed
+        # so far; pass it to checkpoint() once the chunk has been saved
+        state = self.state.load()
+        response = self.open(state)
+        if response is None:
+            logger.info(f"{self.name}: feed not modified since last run")
+            return
+
+        resume_from = 0
+        validator = self.checkpoint_validator()
+        if "checkpoint_offset" in state:
+            if not validator:
+                logger.warning(f"{self.name}: feed sent neither ETag nor Last-Modified, "
+                               f"discarding checkpoint at item {state['checkpoint_offset']}")
+            elif state.get("checkpoint_validator") == validator:
+                resume_from = int(state["checkpoint_offset"])
+                logger.info(f"{self.name}: resuming after item {resume_from}")
+            else:
+                logger.info(f"{self.name}: feed changed since the checkpoint, starting over")
+
+        with response:
+            offset = 0
+            chunk = []
+            for item in self.iter_items(response):
+                offset += 1
+                if offset <= resume_from:
+                    continue
+                job = self.normalize(item)
+                if job:
+                    chunk.append(job)
+                if len(chunk) >= chunk_size:
+                    yield offset, chunk
+                    chunk = []
+            if chunk:
+                yield offset, chunk
+
+    def checkpoint_validator(self):
+        # Identifies the feed version a checkpoint offset belongs to: the ETag,
+        # or Last-Modified for feeds that don't send one
+        return self.response_validators.get("etag") or self.response_validators.get("last_modified")
+
+    def checkpoint(self, offset):
+        self.state.save(checkpoint_offset=offset, checkpoint_validator=self.checkpoint_validator() or "")
+
+    def complete(self):
+        # Only a fully processed feed may be skipped by the next conditional GET.
+        # After a 304 the stored validators are still the current ones.
+        if self.not_modified:
+            return
+        self.state.clear("checkpoint_offset", "checkpoint_validator", "checkpoint_etag", "etag", "last_modified")
+        self.state.save(**self.response_validators)
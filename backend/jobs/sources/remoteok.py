@@ -0,0 +1,62 @@
+from django.utils import timezone
+from datetime import datetime
+from .base import JobSource
+import json
+
+
+class RemoteOKSource(JobSource):
+    name = "remoteok"
+    url = "https://remoteok.com/api"
+
+    def external_id(self, raw_id):
+        # Stored un-prefixed since before other sources existed
+        return str(raw_id) if raw_id not in (None, "") else None
+
+    def normalize(self, job):
+        # The first element is a legal notice, not a job
+        if not isinstance(job, dict) or 'tags' not in job:
+            return None
+
+        # Handle date conversion properly ("2025-08-01" or a full ISO timestamp)
+        date_str = job.get("date")
+        try:
+            posted_date = datetime.strptime(date_str[:10], "%Y-%m-%d").date() if date_str else timezone.now().date()
+        except (ValueError, TypeError):
+            posted_date = timezone.now().date()
+
+        # Convert tags to JSON-serializable list
+        tags = job.get("tags", [])
+        if isinstance(tags, str):
+            try:
+                tags = json.loads(tags)
+            except json.JSONDecodeError:
+                tags = [tags]
+
+        # Convert benefits to JSON-serializable list
+        benefits = job.get("benefits", [])
+        if isinstance(benefits, str):
+            try:
+                benefits = json.loads(benefits)
+            except json.JSONDecodeError:
+                benefits = [benefits]
+
+        # Ensure salary is a string, falling back to the numeric range
+        salary = job.get("salary")
+        if not salary and job.get("salary_min"):
+            salary = f"${int(job['salary_min']):,}"
+            if job.get("salary_max"):
+                salary += f" - ${int(job['salary_max']):,}"
+        salary = str(salary or "Not specified")
+
+        return {
+            "external_id": self.external_id(job.get("id")),
+            "title": str(job.get("position", "")),
+            "company": str(job.get("company", "")),
+            "location": str(job.get("location") or "Remote"),
+            "type": str(job.get("type", "Full-time")),
+            "posted": posted_date,
+            "description": str(job.get("description", "")),
+            "tags": tags,
+            "salary": salary,
+            "benefits": benefits,
+        }
@@ -1,3 +1,538 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from jobs.ai_utils import cacheable_enrichments, enrichment_cache_key, parse_precomputed_feed, precomputed_feed_value, enrich_job_with_ai, experience_bucket, match_profile_fingerprint
+from jobs.chat_cache import cached_reply_from_results, chat_cache_text, profile_bucket
+from jobs.ingestion import save_job_chunk
+from jobs.job_vectors import JOB_CORPUS_VERSION_KEY, job_doc_key, job_key, write_job_vectors
+from jobs.management.commands.run_enrichment_worker import Command as EnrichmentWorkerCommand
+from jobs.llm_gateway import CircuitBreaker, LLMGateway, LLMUnavailableError, RetryBudget, TokenBucket
+from jobs.models import Job, JobIndexOutbox
+from jobs.skill_scoring import blended_match_score, normalize_skill, score_job_locally, skill_overlap
+from jobs.sources import MemoryIngestionState, RemoteOKSource, build_session, iter_json_array
+from datetime import date
+import json
+import numpy as np
+import threading
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+REMOTEOK_FEED = [
+    {"legal": "API terms of service"},
+    {"id": "101", "position": "Backend Engineer", "company": "Acme", "location": "Remote",
+     "date": "2025-08-01T10:00:00+00:00", "description": "Django", "tags": ["python", "django"],
+     "salary_min": 90000, "salary_max": 120000},
+    {"id": "102", "position": "Data Engineer", "company": "Globex", "location": "",
+     "date": "2025-08-02", "description": "Pipelines", "tags": ["sql"]},
+    {"id": "103", "position": "ML Engineer", "company": "Initech", "location": "Berlin",
+     "date": "2025-08-03", "description": "Models", "tags": ["pytorch"], "salary": "€70k"},
+]
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    # Local stand-in for the RemoteOK API with ETag / Last-Modified support;
+    # the body is sent in small writes so the streaming parser sees split items
+    etag = '"feed-v1"'
+    last_modified = None
+    requests_seen = []
+
+    def do_GET(self):
+        self.requests_seen.append(dict(self.headers))
+        if (self.etag and self.headers.get("If-None-Match") == self.etag) or (
+                self.last_modified and self.headers.get("If-Modified-Since") == self.last_modified):
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = json.dumps(REMOTEOK_FEED).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if self.etag:
+            self.send_header("ETag", self.etag)
+        if self.last_modified:
+            self.send_header("Last-Modified", self.last_modified)
+        self.end_headers()
+        for start in range(0, len(body), 37):
+            self.wfile.write(body[start:start + 37])
+
+    def log_message(self, *args):
+        pass
+
+
+class IterJsonArrayTests(SimpleTestCase):
+    def test_items_split_across_chunks(self):
+        text = json.dumps([{"a": "x, ]"}, [1, 2], "s", 12345, {"b": None}])
+        chunks = [text[i:i + 3] for i in range(0, len(text), 3)]
+        self.assertEqual(list(iter_json_array(chunks)), [{"a": "x, ]"}, [1, 2], "s", 12345, {"b": None}])
+
+    def test_truncated_array_raises(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array(['[{"a": 1}, {"b"']))
+
+
+class RemoteOKSourceTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FeedHandler)
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/api"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        FeedHandler.requests_seen = []
+        self.state = MemoryIngestionState()
+        self.session = build_session(pool_size=2)
+
+    def make_source(self):
+        return RemoteOKSource(session=self.session, state=self.state, url=self.url)
+
+    def test_streams_and_normalizes_jobs(self):
+        chunks = list(self.make_source().iter_chunks(chunk_size=2))
+
+        self.assertEqual([offset for offset, _ in chunks], [3, 4])
+        jobs = [job for _, chunk in chunks for job in chunk]
+        self.assertEqual([job["external_id"] for job in jobs], ["101", "102", "103"])
+        self.assertEqual(str(jobs[0]["posted"]), "2025-08-01")
+        self.assertEqual(jobs[0]["salary"], "$90,000 - $120,000")
+        self.assertEqual(jobs[1]["location"], "Remote")
+        self.assertEqual(jobs[2]["salary"], "€70k")
+
+    def test_conditional_get_after_complete_run(self):
+        source = self.make_source()
+        list(source.iter_chunks(chunk_size=10))
+        source.complete()
+
+        # fetch_jobs completes a source after a 304 too; that must keep the validators
+        for _ in range(2):
+            source = self.make_source()
+            self.assertEqual(list(source.iter_chunks(chunk_size=10)), [])
+            source.complete()
+            self.assertEqual(FeedHandler.requests_seen[-1].get("If-None-Match"), FeedHandler.etag)
+        self.assertEqual(self.state.load().get("etag"), FeedHandler.etag)
+
+    def test_resumes_from_checkpoint(self):
+        source = self.make_source()
+        first_offset, _ = next(source.iter_chunks(chunk_size=2))
+        source.checkpoint(first_offset)
+
+        chunks = list(self.make_source().iter_chunks(chunk_size=10))
+
+        self.assertIsNone(FeedHandler.requests_seen[-1].get("If-None-Match"))
+        self.assertEqual([job["external_id"] for _, chunk in chunks for job in chunk], ["103"])
+
+    @mock.patch.object(FeedHandler, "etag", None)
+    @mock.patch.object(FeedHandler, "last_modified", "Fri, 01 Aug 2025 00:00:00 GMT")
+    def test_resumes_on_last_modified_without_etag(self):
+        source = self.make_source()
+        first_offset, _ = next(source.iter_chunks(chunk_size=2))
+        source.checkpoint(first_offset)
+
+        chunks = list(self.make_source().iter_chunks(chunk_size=10))
+
+        self.assertEqual([job["external_id"] for _, chunk in chunks for job in chunk], ["103"])
+
+    @mock.patch.object(FeedHandler, "etag", None)
+    def test_checkpoint_without_validator_is_discarded(self):
+        source = self.make_source()
+        first_offset, _ = next(source.iter_chunks(chunk_size=2))
+        source.checkpoint(first_offset)
+
+        with self.assertLogs("jobs.sources.base", level="WARNING"):
+            chunks = list(self.make_source().iter_chunks(chunk_size=10))
+
+        self.assertEqual([job["external_id"] for _, chunk in chunks for job in chunk], ["101", "102", "103"])
+
+
+@override_settings(SKILL_MATCH_WEIGHT=0.5)
+class SkillScoringTests(SimpleTestCase):
+    def test_aliases_normalize_to_one_skill(self):
+        self.assertEqual(normalize_skill(" ReactJS "), "react")
+        self.assertEqual(normalize_skill("K8s"), "kubernetes")
+        self.assertEqual(normalize_skill("Rust"), "rust")
+
+    def test_overlap_keeps_job_spelling(self):
+        matched, missing, overlap = skill_overlap(["JS", "python", "Postgres"], ["JavaScript", "PostgreSQL", "Docker", "docker"])
+        self.assertEqual(matched, ["JavaScript", "PostgreSQL"])
+        self.assertEqual(missing, ["Docker"])
+        self.assertAlmostEqual(overlap, 2 / 3)
+
+    def test_blended_score(self):
+        self.assertEqual(blended_match_score(0.2, 0.5), 65)
+        self.assertEqual(blended_match_score(0.2, None), 80)
+        self.assertEqual(blended_match_score(None, 0.5), 50)
+
+    def test_job_without_tags_scores_on_similarity(self):
+        scored = score_job_locally(["python"], {"tags": []}, 0.4)
+        self.assertEqual(scored["match_score"], 60)
+        self.assertEqual(scored["matched_skills"], [])
+
+
+@override_settings(CHAT_CACHE_SIMILARITY_THRESHOLD=0.9)
+class ChatCacheTests(SimpleTestCase):
+    def test_profile_bucket_ignores_skill_spelling_and_order(self):
+        first = profile_bucket({"role": " Frontend  Developer", "skills": ["ReactJS", "JS", "react"]})
+        second = profile_bucket({"role": "frontend developer", "skills": ["javascript", "React"]})
+        self.assertEqual(first, ("frontend developer", ["javascript", "react"]))
+        self.assertEqual(first, second)
+        self.assertEqual(
+            chat_cache_text(" How do I prepare? ", {"skills": ["JS"]}),
+            "Role: developer\nSkills: javascript\nQuestion: How do I prepare?",
+        )
+
+    def test_reply_returned_only_above_threshold(self):
+        def results(distance):
+            return SimpleNamespace(docs=[SimpleNamespace(id="chatcache:entry:1", reply="Practice", score=str(distance))])
+
+        self.assertEqual(cached_reply_from_results(results(0.05)), ("chatcache:entry:1", "Practice"))
+        self.assertIsNone(cached_reply_from_results(results(0.2)))
+        self.assertIsNone(cached_reply_from_results(SimpleNamespace(docs=[])))
+
+
+class ResourceExhausted(Exception):
+    # Same name as the google.api_core quota error
+    pass
+
+
+class FakeModel:
+    # Stand-in for the Gemini model: returns or raises the queued outcomes in order
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def generate_content(self, prompt, request_options=None, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return SimpleNamespace(text=outcome)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class LLMGatewayTests(SimpleTestCase):
+    def make_gateway(self, model, clock, rate=100.0, burst=100, failure_threshold=5, max_retries=3):
+        return LLMGateway(
+            lambda: model,
+            TokenBucket(rate, burst, clock=clock),
+            CircuitBreaker(failure_threshold, 30, clock=clock),
+            RetryBudget(0.2),
+            max_concurrency=2,
+            max_retries=max_retries,
+            base_delay=0.5,
+            max_delay=8,
+            clock=clock,
+            sleep=clock.sleep,
+        )
+
+    def test_transient_errors_are_retried(self):
+        clock = FakeClock()
+        model = FakeModel(ResourceExhausted("quota"), TimeoutError(), "ok")
+        self.assertEqual(self.make_gateway(model, clock).generate("prompt", 60).text, "ok")
+        self.assertEqual(model.calls, 3)
+        # Jittered backoff stays under the capped exponential delays
+        self.assertLessEqual(clock.now, 0.5 + 1.0)
+
+    def test_other_errors_are_not_retried(self):
+        model = FakeModel(ValueError("bad prompt"), "ok")
+        with self.assertRaises(ValueError):
+            self.make_gateway(model, FakeClock()).generate("prompt", 60)
+        self.assertEqual(model.calls, 1)
+
+    def test_circuit_opens_and_recovers(self):
+        clock = FakeClock()
+        model = FakeModel(*[ResourceExhausted("quota")] * 2, "ok")
+        gateway = self.make_gateway(model, clock, failure_threshold=2, max_retries=0)
+        for _ in range(2):
+            with self.assertRaises(ResourceExhausted):
+                gateway.generate("prompt", 60)
+
+        with self.assertRaises(LLMUnavailableError):
+            gateway.generate("prompt", 60)
+        self.assertEqual(model.calls, 2)
+
+        clock.now += 30
+        self.assertEqual(gateway.generate("prompt", 60).text, "ok")
+        self.assertEqual(gateway.breaker.state, "closed")
+
+    def test_rate_limit_waits_within_deadline(self):
+        clock = FakeClock()
+        gateway = self.make_gateway(FakeModel("a", "b", "c"), clock, rate=1.0, burst=2)
+        gateway.generate("prompt", 60)
+        gateway.generate("prompt", 60)
+        self.assertEqual(gateway.generate("prompt", 60).text, "c")
+        self.assertAlmostEqual(clock.now, 1.0)
+
+        with self.assertRaises(LLMUnavailableError):
+            gateway.generate("prompt", 0.5)
+
+    def test_failed_enrichment_is_not_cached(self):
+        user = SimpleNamespace(name="A", email="a@example.com", role="dev", skills=["python"], experience="2")
+        job = {"id": "1", "title": "Dev", "company": "Acme", "description": "", "tags": ["python"]}
+        with mock.patch("jobs.ai_utils.generate_content", side_effect=LLMUnavailableError("LLM circuit is open")):
+            failed = enrich_job_with_ai(user, job)
+
+        self.assertEqual(failed["match_score"], 0)
+        self.assertEqual(cacheable_enrichments(user, [("key:1", failed), ("key:2", {**job, "match_score": 80})]),
+                         [("key:2", {**job, "match_score": 80})])
+
+    def test_unparseable_enrichment_is_not_cached(self):
+        user = SimpleNamespace(name="A", email="a@example.com", role="dev", skills=["python"], experience="2")
+        job = {"id": "1", "title": "Dev", "company": "Acme", "description": "", "tags": ["python"]}
+        reply = SimpleNamespace(text="match_score: [85]\nmatched_skills: [python]\nmissing_skills: []\nexplanation: ok")
+        with mock.patch("jobs.ai_utils.generate_content", return_value=reply):
+            failed = enrich_job_with_ai(user, job)
+
+        self.assertEqual(failed["match_score"], 0)
+        self.assertEqual(cacheable_enrichments(user, [("key:1", failed)]), [])
+
+
+class EnrichmentFingerprintTests(SimpleTestCase):
+    def profile(self, **fields):
+        return SimpleNamespace(**{
+            "name": "Ada", "email": "ada@example.com", "role": "Backend Developer",
+            "skills": ["Python", "Django", "Postgres"], "experience": "2-4", **fields,
+        })
+
+    def test_shared_across_users_and_skill_order(self):
+        fingerprint = match_profile_fingerprint(self.profile())
+        self.assertEqual(fingerprint, match_profile_fingerprint(self.profile(
+            name="Grace", email="grace@example.com", role=" backend  developer",
+            skills=["postgresql", "django", "PYTHON"],
+        )))
+        self.assertNotEqual(fingerprint, match_profile_fingerprint(self.profile(skills=["Python", "Django"])))
+        self.assertNotEqual(fingerprint, match_profile_fingerprint(self.profile(experience="5-7")))
+
+    def test_experience_bucket(self):
+        self.assertEqual(experience_bucket("10+"), "10+")
+        self.assertEqual(experience_bucket(" 3 years"), "2-4")
+        self.assertEqual(experience_bucket("10"), "8-10")
+        self.assertEqual(experience_bucket("15"), "10+")
+        self.assertEqual(experience_bucket(""), "")
+
+
+class FakeRedis:
+    # Just the hash/counter commands write_job_vectors uses, with pipelines
+    # replayed on execute()
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def hmget(self, key, *fields):
+        return [self.data.get(key, {}).get(field) for field in fields]
+
+    def hset(self, key, mapping):
+        self.data.setdefault(key, {}).update(
+            {field: value if isinstance(value, bytes) else str(value) for field, value in mapping.items()}
+        )
+
+    def hdel(self, key, *fields):
+        for field in fields:
+            self.data.get(key, {}).pop(field, None)
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def incrby(self, key, amount):
+        self.data[key] = int(self.data.get(key, 0)) + amount
+        return self.data[key]
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class FakeEmbeddingModel:
+    def __init__(self):
+        self.encoded = 0
+
+    def encode(self, texts, **kwargs):
+        self.encoded += len(texts)
+        return np.full((len(texts), 384), 1 / np.sqrt(384), dtype=np.float32)
+
+
+class EnrichmentWorkerTests(SimpleTestCase):
+    def test_entries_queued_under_an_old_profile_are_acked_but_not_stored(self):
+        user = SimpleNamespace(id="u1", email="a@example.com", role="dev", skills=["python"], experience="2")
+        current_key = enrichment_cache_key(match_profile_fingerprint(user), "1")
+        entries = [
+            ("1-0", {"user_id": "u1", "job_id": "1", "cache_key": current_key, "distance": "0.2"}),
+            ("2-0", {"user_id": "u1", "job_id": "2", "cache_key": "enrichment:cache:old:job:2", "distance": "0.3"}),
+        ]
+        worker = "jobs.management.commands.run_enrichment_worker"
+        with mock.patch(f"{worker}.UserProfile.objects.get", return_value=user), \
+                mock.patch(f"{worker}.fetch_jobs_from_index", return_value=[{"id": "1"}]) as fetch, \
+                mock.patch(f"{worker}.score_jobs", return_value=[{"id": "1", "match_score": 80}]), \
+                mock.patch(f"{worker}.store_enriched_jobs") as store, \
+                mock.patch(f"{worker}.acknowledge") as acknowledge:
+            EnrichmentWorkerCommand().process(entries)
+
+        fetch.assert_called_once_with(["1"])
+        store.assert_called_once_with(user, [(current_key, {"id": "1", "match_score": 80})])
+        acknowledge.assert_called_once_with(entries)
+
+
+class WriteJobVectorsTests(SimpleTestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.model = FakeEmbeddingModel()
+        for target, value in (("redis_client", self.redis), ("get_embedding_model", lambda: self.model)):
+            patcher = mock.patch(f"jobs.job_vectors.{target}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def job(self, **fields):
+        return SimpleNamespace(**{
+            "id": "7", "title": "Backend Engineer", "description": "Django APIs", "tags": ["python"],
+            "company": "Acme", "location": "Berlin", "type": "Full-time", "posted": date(2025, 8, 1),
+            "salary": "$90k - $120k", "benefits": [], **fields,
+        })
+
+    def test_metadata_only_update_reaches_redis_without_reembedding(self):
+        self.assertEqual(write_job_vectors([self.job()]), 1)
+        embedding = self.redis.data[job_key("7")]["embedding"]
+
+        self.assertEqual(write_job_vectors([self.job(location="Remote", salary="Not specified", benefits=["Equity"])]), 0)
+        stored = self.redis.data[job_key("7")]
+        self.assertEqual(self.model.encoded, 1)
+        self.assertEqual(stored["location"], "Remote")
+        self.assertNotIn("salary_min", stored)
+        self.assertEqual(stored["embedding"], embedding)
+        self.assertEqual(self.redis.data[job_doc_key("7")]["benefits"], '["Equity"]')
+        # Same vectors, so precomputed feeds stay current
+        self.assertEqual(self.redis.data[JOB_CORPUS_VERSION_KEY], 1)
+
+    def test_corpus_version_counts_changed_vectors(self):
+        write_job_vectors([self.job(id="1"), self.job(id="2")])
+        write_job_vectors([self.job(id="1", title="Staff Engineer"), self.job(id="2")])
+        self.assertEqual(self.redis.data[JOB_CORPUS_VERSION_KEY], 3)
+
+
+@override_settings(FEED_PRECOMPUTED_MAX_STALE_JOBS=2)
+class PrecomputedFeedTests(SimpleTestCase):
+    def test_served_until_too_many_vectors_changed(self):
+        stored = precomputed_feed_value([["job-1", 0.1]], 10)
+        self.assertEqual(parse_precomputed_feed(stored, "10"), [["job-1", 0.1]])
+        self.assertEqual(parse_precomputed_feed(stored, "12"), [["job-1", 0.1]])
+        self.assertIsNone(parse_precomputed_feed(stored, "13"))
+        # Counter reset (e.g. Redis flushed): the feed can't be trusted
+        self.assertIsNone(parse_precomputed_feed(stored, None))
+        self.assertIsNone(parse_precomputed_feed(None, "10"))
+
+
+
+def job_row(**overrides):
+    row = {
+        "external_id": "remoteok-1",
+        "title": "Backend Engineer",
+        "company": "Acme",
+        "location": "Remote",
+        "type": "Full-time",
+        "posted": date(2024, 5, 1),
+        "description": "Build APIs",
+        "tags": ["python"],
+        "salary": "$100k",
+        "benefits": [],
+    }
+    row.update(overrides)
+    return row
+
+
+class SaveJobChunkTests(TestCase):
+    def test_new_rows_are_inserted_and_known_ids_updated(self):
+        self.assertEqual(save_job_chunk([job_row()]), {"inserted": 1, "updated": 0, "skipped": 0})
+
+        counts = save_job_chunk([job_row(description="Build and run APIs")])
+
+        self.assertEqual(counts, {"inserted": 0, "updated": 1, "skipped": 0})
+        job = Job.objects.get()
+        self.assertEqual(job.external_id, "remoteok-1")
+        self.assertEqual(job.description, "Build and run APIs")
+
+    def test_unchanged_rows_are_skipped_and_not_requeued(self):
+        save_job_chunk([job_row(), job_row(external_id=None, title="Data Engineer")])
+        JobIndexOutbox.objects.all().delete()
+
+        counts = save_job_chunk([job_row(), job_row(external_id=None, title="Data Engineer")])
+
+        self.assertEqual(counts, {"inserted": 0, "updated": 0, "skipped": 2})
+        self.assertFalse(JobIndexOutbox.objects.exists())
+
+    def test_known_id_renamed_onto_another_posting_is_skipped(self):
+        save_job_chunk([job_row(), job_row(external_id="remoteok-2", title="Data Engineer")])
+
+        # remoteok-2 now has the same title/company/location as remoteok-1
+        counts = save_job_chunk([job_row(external_id="remoteok-2", description="Pipelines")])
+
+        self.assertEqual(counts, {"inserted": 0, "updated": 0, "skipped": 1})
+        self.assertEqual(Job.objects.get(external_id="remoteok-2").title, "Data Engineer")
+
+    def test_relisted_posting_under_a_new_id_is_skipped(self):
+        save_job_chunk([job_row()])
+
+        counts = save_job_chunk([job_row(external_id="remoteok-99")])
+
+        self.assertEqual(counts, {"inserted": 0, "updated": 0, "skipped": 1})
+        self.assertEqual(list(Job.objects.values_list("external_id", flat=True)), ["remoteok-1"])
+
+    def test_row_without_id_adopts_the_owners_external_id(self):
+        save_job_chunk([job_row()])
+
+        counts = save_job_chunk([job_row(external_id=None, salary="$120k")])
+
+        self.assertEqual(counts, {"inserted": 0, "updated": 1, "skipped": 0})
+        job = Job.objects.get()
+        self.assertEqual(job.external_id, "remoteok-1")
+        self.assertEqual(job.salary, "$120k")
+
+    def test_id_less_job_takes_the_incoming_external_id(self):
+        save_job_chunk([job_row(external_id=None)])
+
+        counts = save_job_chunk([job_row(external_id="remoteok-7", salary="$120k")])
+
+        self.assertEqual(counts, {"inserted": 0, "updated": 1, "skipped": 0})
+        self.assertEqual(Job.objects.get().external_id, "remoteok-7")
+
+    def test_invalid_and_repeated_rows_in_a_chunk_are_skipped(self):
+        counts = save_job_chunk([
+            job_row(),
+            job_row(external_id="remoteok-2"),  # same fingerprint
+            job_row(title="Data Engineer"),  # same external id
+            job_row(external_id="remoteok-3", description=""),
+        ])
+
+        self.assertEqual(counts, {"inserted": 1, "updated": 0, "skipped": 3})
+
+    def test_near_duplicates_are_skipped_only_for_new_jobs(self):
+        save_job_chunk([job_row()])
+
+        counts = save_job_chunk(
+            [job_row(salary="$120k"), job_row(external_id="remoteok-2", title="Senior Backend Engineer")],
+            near_duplicate=lambda row: True,
+        )
+
+        self.assertEqual(counts, {"inserted": 0, "updated": 1, "skipped": 1})
@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import UserProfileViewSet, JobViewSet , AIChatAssistantView , MatchedJobsView , CachedJobDetailView
+from .views import AIChatStreamView, AsyncAIChatAssistantView, AsyncAIChatStreamView, AsyncMatchedJobsView
 
 router = DefaultRouter()
 router.register(r'profiles', UserProfileViewSet)
@@ -9,6 +10,11 @@ router.register(r'jobs', JobViewSet)
 urlpatterns = [
     path('', include(router.urls)),
     path('chat/', AIChatAssistantView.as_view(), name='ai_chat'),
+    path('chat/stream/', AIChatStreamView.as_view(), name='ai_chat_stream'),
     path("redis-matched-jobs/<str:user_id>/", MatchedJobsView.as_view(), name="matched-jobs"),
+    # Same endpoints as async views, for running under an ASGI server
+    path('async/chat/', AsyncAIChatAssistantView.as_view(), name='ai_chat_async'),
+    path('async/chat/stream/', AsyncAIChatStreamView.as_view(), name='ai_chat_stream_async'),
+    path("async/redis-matched-jobs/<str:user_id>/", AsyncMatchedJobsView.as_view(), name="matched-jobs-async"),
     path('api/redis-job-detail/<str:job_id>/<str:user_id>/', CachedJobDetailView.as_view(), name='job-detail-cached'),
 ]
@@ -0,0 +1,109 @@
+from django.conf import settings
+from .model_registry import embedding_model_id
+from .redis_client import redis_binary_client
+from .vector_index import EMBEDDING_DIM
+import numpy as np
+import threading
+import time
+
+# How job vectors are stored in Redis: element type and, optionally, a PCA
+# projection fitted on the job corpus (`manage.py fit_vector_pca`). Query
+# vectors must go through the same encoding as the vectors they search.
+VECTOR_DTYPES = {"FLOAT32": np.float32, "FLOAT16": np.float16}
+
+_pca = None
+_pca_lock = threading.Lock()
+
+
+def vector_type():
+    value = settings.VECTOR_STORAGE_TYPE.upper()
+    if value not in VECTOR_DTYPES:
+        raise ValueError(f"Unsupported VECTOR_STORAGE_TYPE: {settings.VECTOR_STORAGE_TYPE}")
+    return value
+
+
+def vector_dim():
+    # Dimension of the stored vectors; the model's own unless PCA is enabled
+    return settings.VECTOR_PCA_DIM or EMBEDDING_DIM
+
+
+def pca_key():
+    return f"vector_pca:{embedding_model_id()}"
+
+
+def save_pca(mean, components):
+    # components: (dim, EMBEDDING_DIM) rows as returned by sklearn's PCA
+    global _pca
+    fitted_at = str(int(time.time()))
+    redis_binary_client.hset(pca_key(), mapping={
+        "dim": str(components.shape[0]),
+        "fitted_at": fitted_at,
+        "mean": np.asarray(mean, dtype=np.float32).tobytes(),
+        "components": np.asarray(components, dtype=np.float32).tobytes(),
+    })
+    with _pca_lock:
+        _pca = None
+    return fitted_at
+
+
+def get_pca():
+    # Loaded once per process; refitting requires re-running cache_job_vectors
+    # and restarting the web and worker processes
+    global _pca
+    if not settings.VECTOR_PCA_DIM:
+        return None
+    if _pca is None:
+        with _pca_lock:
+            if _pca is None:
+                stored = redis_binary_client.hgetall(pca_key())
+                if not stored:
+                    raise RuntimeError("VECTOR_PCA_DIM is set but no projection is stored; run `manage.py fit_vector_pca`")
+                dim = int(stored[b"dim"])
+                if dim != settings.VECTOR_PCA_DIM:
+                    raise RuntimeError(
+                        f"Stored PCA projection has {dim} dimensions, VECTOR_PCA_DIM is {settings.VECTOR_PCA_DIM}; "
+                        "run `manage.py fit_vector_pca` again"
+                    )
+                _pca = {
+                    "fitted_at": stored[b"fitted_at"].decode(),
+                    "mean": np.frombuffer(stored[b"mean"], dtype=np.float32),
+                    "components": np.frombuffer(stored[b"components"], dtype=np.float32).reshape(dim, EMBEDDING_DIM),
+                }
+    return _pca
+
+
+def vector_format():
+    # Stored next to each job vector so a format change triggers re-encoding
+    pca = get_pca()
+    suffix = f":pca{pca['fitted_at']}" if pca else ""
+    return f"{vector_type()}:{vector_dim()}{suffix}"
+
+
+def reduce_vectors(vectors, mean, components):
+    # Project onto the principal components and re-normalize, so cosine and
+    # dot-product scores stay comparable to the full vectors
+    projected = (np.asarray(vectors, dtype=np.float32) - mean) @ components.T
+    norms = np.linalg.norm(projected, axis=-1, keepdims=True)
+    return projected / np.maximum(norms, 1e-12)
+
+
+def to_storage_space(vectors):
+    # Full-size float32 model output -> stored dimension and element type
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    pca = get_pca()
+    if pca:
+        vectors = reduce_vectors(vectors, pca["mean"], pca["components"])
+    return vectors.astype(VECTOR_DTYPES[vector_type()])
+
+
+def encode_vectors(vectors):
+    # One bytes value per vector, as written to and queried against Redis
+    return [row.tobytes() for row in to_storage_space(vectors)]
+
+
+def vector_to_bytes(vector):
+    return encode_vectors(vector)[0]
+
+
+def bytes_to_vector(data):
+    return np.frombuffer(data, dtype=VECTOR_DTYPES[vector_type()]).astype(np.float32)
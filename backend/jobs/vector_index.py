@@ -0,0 +1,170 @@
+from django.conf import settings
+from redis.commands.search.field import NumericField, TagField, VectorField
+from redis.commands.search.index_definition import IndexDefinition, IndexType
+from redis.exceptions import ResponseError
+from .redis_client import redis_client
+from datetime import datetime, time as dt_time, timezone as dt_timezone
+import logging
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+# Searches always go through the alias, never a physical index name
+JOB_INDEX_ALIAS = "job_idx"
+JOB_KEY_PREFIX = "job:"
+EMBEDDING_DIM = 384
+
+# Bump whenever the fields below change so rebuilds can be detected
+INDEX_SCHEMA_VERSION = 2
+
+# Location values that count as remote for the `remote` filter
+REMOTE_LOCATIONS = ("remote", "worldwide", "anywhere")
+
+# Records which physical index the alias currently points at and how it was built
+INDEX_META_KEY = f"vector_index:{JOB_INDEX_ALIAS}"
+
+
+def index_settings(algorithm=None, m=None, ef_construction=None, ef_runtime=None):
+    config = {
+        "algorithm": (algorithm or settings.VECTOR_INDEX_ALGORITHM).upper(),
+        "distance_metric": settings.VECTOR_INDEX_DISTANCE_METRIC,
+        # Must match how job vectors are written (see jobs/vector_codec.py)
+        "vector_type": settings.VECTOR_STORAGE_TYPE.upper(),
+        "dim": settings.VECTOR_PCA_DIM or EMBEDDING_DIM,
+    }
+    if config["algorithm"] == "HNSW":
+        config.update({
+            "m": m or settings.VECTOR_INDEX_HNSW_M,
+            "ef_construction": ef_construction or settings.VECTOR_INDEX_HNSW_EF_CONSTRUCTION,
+            "ef_runtime": ef_runtime or settings.VECTOR_INDEX_HNSW_EF_RUNTIME,
+        })
+    return config
+
+
+def build_schema(config):
+    vector_attributes = {
+        "TYPE": config["vector_type"],
+        "DIM": config["dim"],
+        "DISTANCE_METRIC": config["distance_metric"],
+    }
+    if config["algorithm"] == "HNSW":
+        vector_attributes.update({
+            "M": config["m"],
+            "EF_CONSTRUCTION": config["ef_construction"],
+            "EF_RUNTIME": config["ef_runtime"],
+        })
+    elif config["algorithm"] != "FLAT":
+        raise ValueError(f"Unsupported vector algorithm: {config['algorithm']}")
+
+    return [
+        TagField("type", separator="|"),
+        TagField("location", separator=","),
+        TagField("tag_set", separator="|"),
+        NumericField("posted_ts", sortable=True),
+        NumericField("salary_min"),
+        VectorField("embedding", config["algorithm"], vector_attributes),
+    ]
+
+
+def get_index_info(name):
+    try:
+        return redis_client.ft(name).info()
+    except ResponseError:
+        return None
+
+
+def get_current_index_name():
+    info = get_index_info(JOB_INDEX_ALIAS)
+    return info["index_name"] if info else None
+
+
+def wait_for_indexing(name, poll_interval=1.0, timeout=None):
+    started = time.monotonic()
+    while True:
+        info = get_index_info(name)
+        if info and str(info.get("indexing", "0")) == "0" and float(info.get("percent_indexed", 1)) >= 1:
+            return info
+        if timeout is not None and time.monotonic() - started > timeout:
+            raise TimeoutError(f"Index {name} did not finish building within {timeout}s")
+        time.sleep(poll_interval)
+
+
+def rebuild_job_index(config, drop_old=True, timeout=None):
+    # Build into a fresh physical index and only move the alias once the
+    # background scan of existing job:* hashes has finished, so searches
+    # never see a half-built index.
+    new_name = f"{JOB_INDEX_ALIAS}_v{INDEX_SCHEMA_VERSION}_{int(time.time())}"
+    old_name = get_current_index_name()
+
+    redis_client.ft(new_name).create_index(
+        build_schema(config),
+        definition=IndexDefinition(prefix=[JOB_KEY_PREFIX], index_type=IndexType.HASH),
+    )
+    wait_for_indexing(new_name, timeout=timeout)
+
+    if old_name == JOB_INDEX_ALIAS:
+        # Legacy index created by hand under the alias name; it has to go
+        # before the alias can take over the name.
+        logger.warning("Dropping legacy index %s to replace it with an alias", JOB_INDEX_ALIAS)
+        redis_client.ft(JOB_INDEX_ALIAS).dropindex(delete_documents=False)
+        old_name = None
+
+    redis_client.ft(new_name).aliasupdate(JOB_INDEX_ALIAS)
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.delete(INDEX_META_KEY)
+    pipe.hset(INDEX_META_KEY, mapping={
+        "index_name": new_name,
+        "schema_version": INDEX_SCHEMA_VERSION,
+        **{key: str(value) for key, value in config.items()},
+    })
+    pipe.execute()
+
+    if drop_old and old_name and old_name != new_name:
+        redis_client.ft(old_name).dropindex(delete_documents=False)
+
+    return new_name
+
+
+def index_is_current(config):
+    meta = redis_client.hgetall(INDEX_META_KEY)
+    if not meta or get_current_index_name() != meta.get("index_name"):
+        return False
+    expected = {"schema_version": str(INDEX_SCHEMA_VERSION), **{k: str(v) for k, v in config.items()}}
+    return all(meta.get(key) == value for key, value in expected.items())
+
+
+def escape_tag(value):
+    # Punctuation and spaces are separators inside a TAG query unless escaped
+    return re.sub(r"([^\w])", r"\\\1", value.strip().lower())
+
+
+def tag_clause(field, values):
+    values = [escape_tag(value) for value in values if value and value.strip()]
+    return f"@{field}:{{{'|'.join(values)}}}" if values else ""
+
+
+def build_filter_query(filters):
+    # Pre-filter expression for the left-hand side of a hybrid KNN query, so
+    # the KNN slots are spent only on jobs the user can actually see
+    if not filters:
+        return "*"
+
+    clauses = []
+    if filters.get("type"):
+        clauses.append(tag_clause("type", filters["type"]))
+    if filters.get("location"):
+        clauses.append(tag_clause("location", filters["location"]))
+    if filters.get("remote"):
+        clauses.append(tag_clause("location", REMOTE_LOCATIONS))
+    if filters.get("posted_after"):
+        posted_after = datetime.combine(filters["posted_after"], dt_time.min, tzinfo=dt_timezone.utc)
+        clauses.append(f"@posted_ts:[{int(posted_after.timestamp())} +inf]")
+    for tag in filters.get("tags") or []:
+        # Every required tag must be present
+        clauses.append(tag_clause("tag_set", [tag]))
+    if filters.get("min_salary"):
+        clauses.append(f"@salary_min:[{int(filters['min_salary'])} +inf]")
+
+    clauses = [clause for clause in clauses if clause]
+    return f"({' '.join(clauses)})" if clauses else "*"
@@ -2,19 +2,26 @@ from django.shortcuts import render
 
 # Create your views here.
 from rest_framework import viewsets
-from .models import UserProfile, Job
+from .models import UserProfile, Job, JobMatch
 from .redis_client import redis_client
-from .serializers import UserProfileSerializer, JobSerializer
+from .serializers import UserProfileSerializer, JobSerializer, JobMatchSerializer
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny 
-from .ai_utils import get_ai_chat_response
+from .ai_utils import CHAT_FALLBACK_REPLY, get_ai_chat_response, stream_ai_chat_response
 from rest_framework.views import APIView
-from .ai_utils import match_user_to_jobs
+from .ai_utils import match_user_to_jobs, record_feed_activity, user_profile_hash, invalidate_profile_vector, InvalidCursorError, enrichment_cache_key, match_profile_fingerprint
+from .async_matching import aget_ai_chat_response, amatch_user_to_jobs, arecord_feed_activity, astream_ai_chat_response
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework import status
 from django.shortcuts import get_object_or_404
+from django.conf import settings
 import logging
-import hashlib
+from datetime import datetime
+import asyncio
 import json
 logger = logging.getLogger(__name__)
 
@@ -23,6 +30,16 @@ class UserProfileViewSet(viewsets.ModelViewSet):
     serializer_class = UserProfileSerializer
     permission_classes = [AllowAny]
 
+    def perform_update(self, serializer):
+        old_hash = user_profile_hash(serializer.instance)
+        profile = serializer.save()
+        if user_profile_hash(profile) != old_hash:
+            invalidate_profile_vector(old_hash)
+
+    def perform_destroy(self, instance):
+        invalidate_profile_vector(user_profile_hash(instance))
+        instance.delete()
+
     @action(detail=False, methods=['get'], url_path='me')
     def get_me(self, request):
         email = request.user.email if request.user and request.user.is_authenticated else request.query_params.get("email")
@@ -41,6 +58,18 @@ class JobViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Job.objects.all()
     serializer_class = JobSerializer
 
+    def retrieve(self, request, *args, **kwargs):
+        job = self.get_object()
+        data = self.get_serializer(job).data
+
+        # Match results are per user, so merge in the requesting user's one
+        user_id = request.query_params.get("user_id")
+        if user_id:
+            match = JobMatch.objects.filter(user_id=user_id, job=job).first()
+            if match:
+                data.update(JobMatchSerializer(match).data)
+        return Response(data)
+
 class AIChatAssistantView(APIView):
     permission_classes = [AllowAny]
 
@@ -54,6 +83,126 @@ class AIChatAssistantView(APIView):
         ai_reply = get_ai_chat_response(user_input, user_profile)
         return Response({'reply': ai_reply})
     
+def sse_event(data, event=None):
+    lines = [f"event: {event}"] if event else []
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def read_chat_request(request):
+    # (message, user_profile) from a JSON chat request body
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError:
+        raise ValueError("Invalid JSON body")
+    if not data.get('message'):
+        raise ValueError("Message is required")
+    return data['message'], data.get('user_profile') or {}
+
+
+def event_stream_response(events):
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Stop nginx-style proxies from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def chat_events(pieces):
+    # Reply text as server-sent events: one "message" event per chunk, then
+    # "done", or "error" if Gemini fails or times out mid-reply
+    try:
+        for piece in pieces:
+            yield sse_event({"text": piece})
+        yield sse_event({}, event="done")
+    except GeneratorExit:
+        # Client went away; closing `pieces` stops reading from Gemini
+        logger.info("Chat stream closed by the client")
+        raise
+    except Exception as e:
+        logger.error(f"Chat stream failed: {str(e) or type(e).__name__}", exc_info=True)
+        yield sse_event({"error": CHAT_FALLBACK_REPLY}, event="error")
+    finally:
+        pieces.close()
+
+
+async def achat_events(pieces):
+    try:
+        async for piece in pieces:
+            yield sse_event({"text": piece})
+        yield sse_event({}, event="done")
+    except asyncio.CancelledError:
+        # ASGI cancels the response when the client disconnects
+        logger.info("Chat stream closed by the client")
+        raise
+    except Exception as e:
+        logger.error(f"Chat stream failed: {str(e) or type(e).__name__}", exc_info=True)
+        yield sse_event({"error": CHAT_FALLBACK_REPLY}, event="error")
+    finally:
+        await pieces.aclose()
+
+
+# Streams the chat reply as it is generated (SSE over a POST response, read
+# with fetch on the client). The sync view streams under WSGI/runserver; the
+# async one under an ASGI server.
+@method_decorator(csrf_exempt, name="dispatch")
+class AIChatStreamView(View):
+    def post(self, request):
+        try:
+            message, user_profile = read_chat_request(request)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        return event_stream_response(chat_events(stream_ai_chat_response(message, user_profile)))
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncAIChatStreamView(View):
+    async def post(self, request):
+        try:
+            message, user_profile = read_chat_request(request)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        return event_stream_response(achat_events(astream_ai_chat_response(message, user_profile)))
+
+
+def parse_match_filters(params):
+    # Optional feed filters, pushed down into the vector search
+    def split(name):
+        return [value.strip() for value in params.get(name, "").split(",") if value.strip()]
+
+    filters = {
+        "type": split("type"),
+        "location": split("location"),
+        "remote": params.get("remote", "").lower() in ("1", "true", "yes"),
+        "tags": split("tags"),
+    }
+    if params.get("posted_after"):
+        filters["posted_after"] = datetime.strptime(params["posted_after"], "%Y-%m-%d").date()
+    if params.get("min_salary"):
+        filters["min_salary"] = int(params["min_salary"])
+    return {key: value for key, value in filters.items() if value}
+
+
+def parse_feed_params(params):
+    # Keyword arguments for match_user_to_jobs from the query string; raises
+    # ValueError with a message fit for a 400 response
+    try:
+        filters = parse_match_filters(params)
+        page_size = min(int(params.get("page_size", 10)), settings.FEED_MAX_PAGE_SIZE)
+    except ValueError:
+        raise ValueError("posted_after must be YYYY-MM-DD; min_salary and page_size whole numbers")
+    if page_size < 1:
+        raise ValueError("page_size must be positive")
+
+    defer = params.get("defer")
+    return {
+        "page_size": page_size,
+        "cursor": params.get("cursor"),
+        "defer_enrichment": settings.MATCH_FEED_DEFER_ENRICHMENT if defer is None else defer.lower() in ("1", "true", "yes"),
+        "filters": filters,
+    }
+
+
 class MatchedJobsView(APIView):
     def get(self, request, user_id):
         try:
@@ -61,22 +210,71 @@ class MatchedJobsView(APIView):
         except UserProfile.DoesNotExist:
             return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
 
+        try:
+            feed_params = parse_feed_params(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Lets precompute_feeds find active users without a DB write per request
+        record_feed_activity(user_profile.id)
+
         try:
             # Pass user_profile (not profile_text) directly
-            matched_jobs = match_user_to_jobs(user_profile)
+            matched_jobs = match_user_to_jobs(user_profile, **feed_params)
             return Response(matched_jobs, status=status.HTTP_200_OK)
+        except InvalidCursorError as e:
+            # Profile or filters changed since the cursor was issued; reload from the top
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception("Matching failed:")
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+# Async versions of the feed and chat endpoints for ASGI servers (DRF views
+# are sync-only, so these are plain Django views with the same contract).
+# Redis and Gemini I/O is awaited, so slow LLM calls don't hold a thread each.
+class AsyncMatchedJobsView(View):
+    async def get(self, request, user_id):
+        try:
+            user_profile = await UserProfile.objects.aget(id=user_id)
+        except UserProfile.DoesNotExist:
+            return JsonResponse({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            feed_params = parse_feed_params(request.GET)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        await arecord_feed_activity(user_profile.id)
+
+        try:
+            matched_jobs = await amatch_user_to_jobs(user_profile, **feed_params)
+            return JsonResponse(matched_jobs, status=status.HTTP_200_OK)
+        except InvalidCursorError as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.exception("Matching failed:")
+            return JsonResponse({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncAIChatAssistantView(View):
+    async def post(self, request):
+        try:
+            user_input, user_profile = read_chat_request(request)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        ai_reply = await aget_ai_chat_response(user_input, user_profile)
+        return JsonResponse({'reply': ai_reply})
         
 class CachedJobDetailView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, job_id, user_id):
+        user = get_object_or_404(UserProfile, id=user_id)
         try:
-            user = get_object_or_404(UserProfile, user_id=user_id)
-            user_hash = hashlib.md5(user.email.encode()).hexdigest()
-            redis_key = f"user:{user_hash}:job:{job_id}:enriched"
+            redis_key = enrichment_cache_key(match_profile_fingerprint(user), job_id)
 
             cached_data = redis_client.get(redis_key)
 
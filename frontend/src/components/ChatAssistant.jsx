@@ -5,6 +5,8 @@ import { Card, CardContent } from './ui/card';
 import { Avatar, AvatarFallback } from './ui/avatar';
 import { BrainCircuit, Send, ArrowLeft, User } from 'lucide-react';
 
+const CHAT_STREAM_URL = "http://localhost:8000/api/chat/stream/";
+
 const suggestionQuestions = [
   "What skills should I improve for Google SWE role?",
   "How can I transition from frontend to full-stack?",
@@ -24,33 +26,62 @@ export default function ChatAssistant({ onNavigate, userProfile }) {
   ]);
   const [inputValue, setInputValue] = useState('');
   const [isTyping, setIsTyping] = useState(false);
+  const [isStreaming, setIsStreaming] = useState(false);
   const messagesEndRef = useRef(null);
+  const abortRef = useRef(null);
 
   useEffect(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
   }, [messages, isTyping]);
 
-  const getAIResponse = async (userMessage) => {
-    try {
-      const res = await fetch("http://localhost:8000/api/chat/", {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({
-          message: userMessage,
-          user_profile: userProfile || {},
-        }),
-      });
-
-      const data = await res.json();
-      return data.reply || "Sorry, no response received.";
-    } catch (err) {
-      console.error("AI chat error:", err);
-      return "An error occurred while contacting the AI.";
+  // Stop reading the reply if the user leaves the page mid-answer
+  useEffect(() => () => abortRef.current?.abort(), []);
+
+  // Reads the server-sent events of /api/chat/stream/ and hands each text
+  // chunk to onText as it arrives
+  const streamAIResponse = async (userMessage, onText, signal) => {
+    const res = await fetch(CHAT_STREAM_URL, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({
+        message: userMessage,
+        user_profile: userProfile || {},
+      }),
+      signal,
+    });
+    if (!res.ok || !res.body) {
+      throw new Error(`Chat request failed (${res.status})`);
+    }
+
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) return;
+      buffer += decoder.decode(value, { stream: true });
+
+      // Events are separated by a blank line; keep any partial one for later
+      const events = buffer.split('\n\n');
+      buffer = events.pop();
+      for (const rawEvent of events) {
+        let event = 'message';
+        let data = '';
+        for (const line of rawEvent.split('\n')) {
+          if (line.startsWith('event:')) event = line.slice(6).trim();
+          else if (line.startsWith('data:')) data += line.slice(5).trim();
+        }
+        if (!data) continue;
+        const payload = JSON.parse(data);
+        if (event === 'error') throw new Error(payload.error);
+        if (event === 'done') return;
+        if (payload.text) onText(payload.text);
+      }
     }
   };
 
   const handleSendMessage = async () => {
-    if (!inputValue.trim()) return;
+    if (!inputValue.trim() || isStreaming) return;
 
     const userMessage = {
       id: Date.now(),
@@ -58,22 +89,50 @@ export default function ChatAssistant({ onNavigate, userProfile }) {
       content: inputValue,
       timestamp: new Date()
     };
+    const aiMessageId = Date.now() + 1;
+    const appendToReply = (text) => {
+      setMessages(prev => prev.map(message =>
+        message.id === aiMessageId ? { ...message, content: message.content + text } : message
+      ));
+    };
 
     setMessages(prev => [...prev, userMessage]);
     setInputValue('');
     setIsTyping(true);
+    setIsStreaming(true);
 
-    const aiText = await getAIResponse(inputValue);
+    const controller = new AbortController();
+    abortRef.current = controller;
+    let received = false;
 
-    const aiResponse = {
-      id: Date.now() + 1,
-      type: 'ai',
-      content: aiText,
-      timestamp: new Date()
-    };
+    try {
+      await streamAIResponse(inputValue, (text) => {
+        if (!received) {
+          // First chunk: swap the typing indicator for the reply bubble
+          received = true;
+          setIsTyping(false);
+          setMessages(prev => [...prev, { id: aiMessageId, type: 'ai', content: text, timestamp: new Date() }]);
+        } else {
+          appendToReply(text);
+        }
+      }, controller.signal);
 
-    setMessages(prev => [...prev, aiResponse]);
-    setIsTyping(false);
+      if (!received) {
+        setMessages(prev => [...prev, { id: aiMessageId, type: 'ai', content: "Sorry, no response received.", timestamp: new Date() }]);
+      }
+    } catch (err) {
+      if (err.name === 'AbortError') return;
+      console.error("AI chat error:", err);
+      if (received) {
+        appendToReply("\n\n(The response was interrupted.)");
+      } else {
+        setMessages(prev => [...prev, { id: aiMessageId, type: 'ai', content: "An error occurred while contacting the AI.", timestamp: new Date() }]);
+      }
+    } finally {
+      if (abortRef.current === controller) abortRef.current = null;
+      setIsTyping(false);
+      setIsStreaming(false);
+    }
   };
 
   const handleKeyPress = (e) => {
@@ -192,11 +251,11 @@ export default function ChatAssistant({ onNavigate, userProfile }) {
                 onKeyPress={handleKeyPress}
                 placeholder="Ask me anything about your career..."
                 className="flex-1"
-                disabled={isTyping}
+                disabled={isStreaming}
               />
               <Button
                 onClick={handleSendMessage}
-                disabled={!inputValue.trim() || isTyping}
+                disabled={!inputValue.trim() || isStreaming}
                 className="bg-blue-600 hover:bg-blue-700"
               >
                 <Send className="h-4 w-4" />
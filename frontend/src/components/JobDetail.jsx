@@ -5,7 +5,7 @@ import { Badge } from './ui/badge';
 import { Separator } from './ui/separator';
 import { BrainCircuit, ArrowLeft, MapPin, Calendar, DollarSign, Building, CheckCircle, XCircle, ExternalLink } from 'lucide-react';
 
-export default function JobDetail({ jobId, onNavigate}) {
+export default function JobDetail({ jobId, onNavigate, userProfile }) {
   const [job, setJob] = useState(null);
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -45,14 +45,35 @@ export default function JobDetail({ jobId, onNavigate}) {
 
   useEffect(() => {
     setIsLoading(true);
-    fetch(`http://localhost:8000/api/jobs/${jobId}/`)
-      .then(res => {
-        if (!res.ok) {
-          throw new Error('Failed to fetch job details');
-        }
-        return res.json();
-      })
-      .then(data => {
+    const userId = userProfile?.id || '';
+    // Match data shared by users with the same profile lives in the Redis
+    // enrichment cache and has no JobMatch row; fall back to JobMatch on a miss
+    const cachedMatch = userId
+      ? fetch(`http://localhost:8000/api/redis-job-detail/${jobId}/${encodeURIComponent(userId)}/`)
+          .then(res => (res.ok ? res.json() : null))
+          .catch(() => null)
+      : Promise.resolve(null);
+
+    Promise.all([
+      fetch(`http://localhost:8000/api/jobs/${jobId}/?user_id=${encodeURIComponent(userId)}`)
+        .then(res => {
+          if (!res.ok) {
+            throw new Error('Failed to fetch job details');
+          }
+          return res.json();
+        }),
+      cachedMatch,
+    ])
+      .then(([jobData, cached]) => {
+        const data = cached
+          ? {
+              ...jobData,
+              match_score: cached.match_score,
+              matched_skills: cached.matched_skills,
+              missing_skills: cached.missing_skills,
+              explanation: cached.explanation,
+            }
+          : jobData;
         // Ensure all required properties exist with defaults
         setJob({
           ...data,
@@ -68,7 +89,7 @@ export default function JobDetail({ jobId, onNavigate}) {
       })
       .catch(err => setError(err.message))
       .finally(() => setIsLoading(false));
-  }, [jobId]);
+  }, [jobId, userProfile?.id]);
 
   const getMatchScoreColor = (score) => {
     if (score >= 90) return 'text-green-600 bg-green-50 border-green-200';
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Button } from './ui/button';
 import { Card, CardContent } from './ui/card';
 import { Badge } from './ui/badge';
@@ -6,25 +6,91 @@ import { Input } from './ui/input';
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from './ui/select';
 import { BrainCircuit, MapPin, Calendar, Search, Filter, MessageCircle, User, LogOut } from 'lucide-react';
 
+const PENDING_POLL_INTERVAL_MS = 3000;
+const MAX_PENDING_POLLS = 20;
+
 export default function JobFeed({ onNavigate, userProfile }) {
-  const [jobs, setJobs] = useState([]);
+  // Each loaded page keeps the cursor it was requested with so it can be refreshed
+  const [pages, setPages] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [searchTerm, setSearchTerm] = useState('');
   const [sortBy, setSortBy] = useState('match');
   const [filterLocation, setFilterLocation] = useState('all');
+  const pollAttempts = useRef(0);
+
+  const jobs = pages.flatMap(page => page.jobs);
+
+  const fetchPage = async (cursor) => {
+    const params = new URLSearchParams({ defer: '1' });
+    if (cursor) params.set('cursor', cursor);
+    const response = await fetch(`http://localhost:8000/api/redis-matched-jobs/${userProfile.id}/?${params}`);
+    if (!response.ok) throw new Error(`Feed request failed with ${response.status}`);
+    return response.json();
+  };
 
   useEffect(() => {
-    async function fetchJobs() {
+    let cancelled = false;
+
+    async function fetchFirstPage() {
       try {
-        const response = await fetch(`http://localhost:8000/api/redis-matched-jobs/${userProfile.id}/`);
-        const data = await response.json();
-        setJobs(data);
+        const data = await fetchPage(null);
+        if (cancelled) return;
+        setPages([{ cursor: null, jobs: data.results }]);
+        setNextCursor(data.next_cursor);
       } catch (error) {
         console.error('Error fetching jobs:', error);
       }
     }
-    fetchJobs();
+    fetchFirstPage();
+
+    return () => {
+      cancelled = true;
+    };
   }, []);
 
+  // The feed answers right away; jobs still being analyzed come back with
+  // `pending: true`, so refetch those pages until the worker has filled them in.
+  useEffect(() => {
+    const pendingPages = pages.filter(page => page.jobs.some(job => job.pending));
+    if (pendingPages.length === 0 || pollAttempts.current >= MAX_PENDING_POLLS) return;
+
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      pollAttempts.current += 1;
+      try {
+        const refreshed = await Promise.all(pendingPages.map(page => fetchPage(page.cursor)));
+        if (cancelled) return;
+        setPages(prev => prev.map(page => {
+          const index = pendingPages.indexOf(page);
+          return index === -1 ? page : { ...page, jobs: refreshed[index].results };
+        }));
+      } catch (error) {
+        console.error('Error refreshing jobs:', error);
+      }
+    }, PENDING_POLL_INTERVAL_MS);
+
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [pages]);
+
+  const loadMore = async () => {
+    if (!nextCursor || isLoadingMore) return;
+    setIsLoadingMore(true);
+    try {
+      const data = await fetchPage(nextCursor);
+      pollAttempts.current = 0;
+      setPages(prev => [...prev, { cursor: nextCursor, jobs: data.results }]);
+      setNextCursor(data.next_cursor);
+    } catch (error) {
+      console.error('Error loading more jobs:', error);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const getMatchScoreColor = (score) => {
     if (score >= 90) return 'text-green-600 bg-green-50';
     if (score >= 80) return 'text-blue-600 bg-blue-50';
@@ -172,6 +238,9 @@ const cleanDescription = (text) => {
                       <Badge className={`${getMatchScoreColor(job.match_score)} border-0`}>
                         {getMatchScoreIcon(job.match_score)} {job.match_score}% Match
                       </Badge>
+                      {job.pending && (
+                        <Badge variant="outline" className="text-xs text-gray-500">AI analysis in progress…</Badge>
+                      )}
                     </div>
 
                     <div className="flex items-center space-x-4 text-gray-600 mb-3">
@@ -212,6 +281,14 @@ const cleanDescription = (text) => {
           ))}
         </div>
 
+        {nextCursor && (
+          <div className="flex justify-center mt-6">
+            <Button variant="outline" onClick={loadMore} disabled={isLoadingMore}>
+              {isLoadingMore ? 'Loading...' : 'Load more jobs'}
+            </Button>
+          </div>
+        )}
+
         {filteredAndSortedJobs.length === 0 && (
           <div className="text-center py-12">
             <div className="text-gray-400 mb-4">